@@ -0,0 +1,71 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The per-call overhead of the config getters.
+
+Compare `fed.get_party()`, `fed.get_cluster()` and `fed.get_tls()` served
+from the process-local snapshot, with loading them from the internal kv of
+GCS every call as before.
+
+Usage:
+    python -m benchmarks.bench_config_getters [--calls N]
+"""
+
+import argparse
+import time
+
+import cloudpickle
+import ray.experimental.internal_kv as internal_kv
+
+import fed
+from fed._private.constants import (
+    RAYFED_CLUSTER_KEY,
+    RAYFED_PARTY_KEY,
+    RAYFED_TLS_CONFIG,
+)
+
+
+def _per_call_us(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    cluster = {"alice": {"address": "127.0.0.1:11110"}}
+    fed.init(address="local", cluster=cluster, party="alice")
+    try:
+        print(f"{'getter':>12} {'kv us/call':>12} {'cached us/call':>15}")
+        for getter, key in [
+            (fed.get_party, RAYFED_PARTY_KEY),
+            (fed.get_cluster, RAYFED_CLUSTER_KEY),
+            (fed.get_tls, RAYFED_TLS_CONFIG),
+        ]:
+            uncached_us = _per_call_us(
+                lambda: cloudpickle.loads(internal_kv._internal_kv_get(key)),
+                args.calls,
+            )
+            cached_us = _per_call_us(getter, args.calls)
+            print(f"{getter.__name__:>12} {uncached_us:>12.2f} {cached_us:>15.3f}")
+    finally:
+        fed.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The size of the deltas of a float model updated every round.
+
+Update every element of a float model by a small relative step, like a
+slowly converging model, and report the size of the delta against the
+previous round, and of the compressed full model for comparison.
+
+Usage:
+    python -m benchmarks.bench_delta_encoding [--size N] [--dtype float32]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import fed._private.compression as fed_compression
+import fed._private.delta_encoding as fed_delta_encoding
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1 << 20)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--codec", default=fed_compression.NONE)
+    args = parser.parse_args()
+
+    # The full model is compressed by the same codec as the deltas.
+    full_codec = args.codec
+    if full_codec == fed_compression.NONE:
+        full_codec = fed_delta_encoding._DELTA_CODEC
+
+    rng = np.random.default_rng(0)
+    model = rng.standard_normal(args.size).astype(args.dtype)
+    print(
+        f"{args.size} {args.dtype} elements, {model.nbytes} bytes, "
+        f"codec {args.codec}."
+    )
+    print(
+        f"{'step':>8} {'bytes':>12} {'ratio':>6} {'encode ms':>10} "
+        f"{'full ratio':>10}"
+    )
+    for step in [1e-2, 1e-3, 1e-4, 0]:
+        noise = rng.standard_normal(args.size).astype(args.dtype)
+        updated = (model - step * noise * np.abs(model)).astype(args.dtype)
+        # Step 0 changes only a few elements, for comparison.
+        if step == 0:
+            updated[rng.choice(args.size, args.size // 1000)] += 1
+        start = time.perf_counter()
+        _, delta = fed_delta_encoding.encode(
+            updated.tobytes(), model.tobytes(), args.codec
+        )
+        encode_s = time.perf_counter() - start
+        _, full = fed_compression.compress(updated.tobytes(), full_codec, 0)
+        print(
+            f"{'sparse' if step == 0 else step:>8} {len(delta):>12} "
+            f"{model.nbytes / len(delta):>6.2f} {encode_s * 1e3:>10.2f} "
+            f"{model.nbytes / len(full):>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The time of `import fed` in a fresh process, against a budget.
+
+Ray is imported by `import fed` and takes most of the time, so the budget
+is of the time `import fed` takes on top of `import ray`. The modules which
+should be loaded lazily on the first use are checked as well.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs N] [--budget-ms MS]
+
+It exits with 1 if the budget is exceeded or a lazy module is imported.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+# The modules that `import fed` shouldn't import, though some of them may
+# be imported by ray, e.g. grpc and yaml, which are only reported.
+_LAZY_MODULES = [
+    "numpy",
+    "jax",
+    "fed.grpc.fed_pb2",
+    "fed.grpc.fed_pb2_grpc",
+]
+_REPORTED_MODULES = ["grpc", "google.protobuf", "yaml"]
+
+_TIMER = """
+import sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(",".join(m for m in {modules!r} if m in sys.modules))
+"""
+
+
+def _import_once(module):
+    code = _TIMER.format(module=module, modules=_LAZY_MODULES + _REPORTED_MODULES)
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    loaded = out[1].split(",") if len(out) > 1 and out[1] else []
+    return float(out[0]), loaded
+
+
+def _median_ms(module, runs):
+    # The first run warms up the bytecode cache and the page cache.
+    _, loaded = _import_once(module)
+    return statistics.median(_import_once(module)[0] for _ in range(runs)) * 1e3, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=30)
+    args = parser.parse_args()
+
+    ray_ms, ray_loaded = _median_ms("ray", args.runs)
+    fed_ms, fed_loaded = _median_ms("fed", args.runs)
+    overhead_ms = fed_ms - ray_ms
+    print(f"import ray: {ray_ms:8.1f} ms")
+    print(f"import fed: {fed_ms:8.1f} ms")
+    print(f"overhead:   {overhead_ms:8.1f} ms (budget {args.budget_ms:.1f} ms)")
+
+    lazy_loaded = [m for m in _LAZY_MODULES if m in fed_loaded]
+    for module in _REPORTED_MODULES:
+        by = "ray" if module in ray_loaded else "fed" if module in fed_loaded else None
+        print(f"{module}: " + (f"imported by {by}" if by else "not imported"))
+
+    failed = False
+    if lazy_loaded:
+        print(f"FAILED: imported the lazy modules {lazy_loaded}")
+        failed = True
+    if overhead_ms > args.budget_ms:
+        print("FAILED: over the budget")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The accuracy and bandwidth tradeoff of the quantization.
+
+Serialize a gradient-like float array with each quantization, and report
+the bytes on the wire, the time to serialize and deserialize, and the error
+of the dequantized array.
+
+Usage:
+    python -m benchmarks.bench_quantization [--size N] [--dtype float32]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+import fed._private.compression as fed_compression
+from fed._private.serialization_utils import dumps_frames, loads_frames
+
+
+def _bench(array, quantization, codec, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        data = b"".join(dumps_frames(array, quantization))
+        _, wire = fed_compression.compress(data, codec, 0)
+    dumps_s = (time.perf_counter() - start) / repeats
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        loaded = loads_frames(fed_compression.decompress(wire, codec))
+    loads_s = (time.perf_counter() - start) / repeats
+
+    error = np.abs(loaded.astype(np.float64) - array)
+    relative_error = np.linalg.norm(loaded - array) / np.linalg.norm(array)
+    return len(wire), dumps_s, loads_s, error.max(), relative_error
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", type=int, default=1 << 22)
+    parser.add_argument("--dtype", default="float32")
+    parser.add_argument("--codec", default=fed_compression.NONE)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    # The gradients are mostly small values with a few outliers.
+    array = (np.random.standard_t(4, size=args.size) * 1e-3).astype(args.dtype)
+    print(
+        f"{args.size} {args.dtype} elements, {array.nbytes} bytes, "
+        f"codec {args.codec}."
+    )
+    print(
+        f"{'quantization':>12} {'bytes':>12} {'ratio':>6} {'dumps ms':>9} "
+        f"{'loads ms':>9} {'max error':>10} {'rel error':>10}"
+    )
+    for quantization in [None, "fp16", "bf16", "int8"]:
+        size, dumps_s, loads_s, max_error, relative_error = _bench(
+            array, quantization, args.codec, args.repeats
+        )
+        print(
+            f"{quantization or 'none':>12} {size:>12} {array.nbytes / size:>6.2f} "
+            f"{dumps_s * 1e3:>9.2f} {loads_s * 1e3:>9.2f} "
+            f"{max_error:>10.2e} {relative_error:>10.2e}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The per-call overhead of resolving the FedObjects in the arguments.
+
+Compare `fed._private.tree_util` with flattening and unflattening the
+arguments by `jax.tree_util` as before, if jax is installed.
+
+Usage:
+    python -m benchmarks.bench_tree_util [--calls N]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from fed._private.tree_util import find_instances, replace_instances
+from fed.fed_object import FedObject
+
+
+def _jax_find(args, kwargs):
+    import jax
+
+    leaves, _ = jax.tree_util.tree_flatten((args, kwargs))
+    return [leaf for leaf in leaves if isinstance(leaf, FedObject)]
+
+
+def _jax_replace(args, kwargs):
+    import jax
+
+    leaves, tree = jax.tree_util.tree_flatten((args, kwargs))
+    leaves = [
+        leaf.get_ray_object_ref() if isinstance(leaf, FedObject) else leaf
+        for leaf in leaves
+    ]
+    return jax.tree_util.tree_unflatten(tree, leaves)
+
+
+def _find(args, kwargs):
+    return find_instances((args, kwargs), FedObject)
+
+
+def _replace(args, kwargs):
+    return replace_instances(
+        (args, kwargs), FedObject, lambda arg: arg.get_ray_object_ref()
+    )
+
+
+def _per_call_us(func, args, kwargs, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func(args, kwargs)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=10000)
+    args = parser.parse_args()
+
+    fed_object = FedObject("alice", 1, None)
+    cases = {
+        "scalars": ((1, 2.0, "s"), {}),
+        "fed objects": ((fed_object, fed_object), {"x": fed_object}),
+        "array": ((np.zeros(1000), fed_object), {}),
+        "list of 1000": ((list(range(1000)), fed_object), {}),
+        "nested dict": (
+            ({"a": [fed_object, {"b": (1, 2)}], "c": list(range(100))},),
+            {"lr": 0.1},
+        ),
+    }
+    try:
+        import jax  # noqa: F401
+
+        has_jax = True
+    except ImportError:
+        has_jax = False
+    # Finding is done when the task runs in other party, and replacing is
+    # done when it runs in this party.
+    print(f"{'arguments':>14} {'op':>8} {'jax us/call':>12} {'fed us/call':>12}")
+    for name, (case_args, case_kwargs) in cases.items():
+        for op, jax_func, fed_func in [
+            ("find", _jax_find, _find),
+            ("replace", _jax_replace, _replace),
+        ]:
+            jax_us = (
+                f"{_per_call_us(jax_func, case_args, case_kwargs, args.calls):>12.2f}"
+                if has_jax
+                else f"{'n/a':>12}"
+            )
+            fed_us = _per_call_us(fed_func, case_args, case_kwargs, args.calls)
+            print(f"{name:>14} {op:>8} {jax_us} {fed_us:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
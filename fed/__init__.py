@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from fed._private.sparse import SparseArray
 from fed.api import (get, get_cluster, get_party, get_tls, init, kill, remote,
                      shutdown)
 from fed.barriers import recv, send
@@ -29,4 +30,5 @@ __all__ = [
     "recv",
     "send",
     "FedObject",
+    "SparseArray",
 ]
@@ -0,0 +1,121 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The codecs to compress the cross-silo data.
+
+The codec used is carried along with the data, so the receiver knows how to
+decompress it. `none` means the data is not compressed.
+"""
+
+import functools
+import gzip
+import threading
+
+NONE = "none"
+
+# The data smaller than this is not worth compressing.
+_COMPRESSION_THRESHOLD = 4 * 1024
+
+
+def _gzip_codec():
+    return functools.partial(gzip.compress, compresslevel=6), gzip.decompress
+
+
+def _lz4_codec():
+    try:
+        import lz4.frame
+    except ImportError:
+        raise ImportError(
+            "The lz4 compression requires `lz4`, please install it by "
+            "`pip install lz4`."
+        )
+    return lz4.frame.compress, lz4.frame.decompress
+
+
+# A `ZstdCompressor` is not thread-safe, and the data is compressed by the
+# threads of the serializing executor concurrently, so each thread has its
+# own compressor.
+_zstd_local = threading.local()
+
+
+def _zstd_compress(data):
+    compressor = getattr(_zstd_local, "compressor", None)
+    if compressor is None:
+        import zstandard
+
+        compressor = _zstd_local.compressor = zstandard.ZstdCompressor()
+    return compressor.compress(data)
+
+
+def _zstd_codec():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError(
+            "The zstd compression requires `zstandard`, please install it by "
+            "`pip install zstandard`."
+        )
+    return _zstd_compress, zstandard.decompress
+
+
+_CODEC_LOADERS = {
+    "gzip": _gzip_codec,
+    "lz4": _lz4_codec,
+    "zstd": _zstd_codec,
+}
+
+# Map from the codec name to the loaded (compress, decompress) functions.
+_codecs = {}
+
+
+def _get_codec(codec):
+    if codec not in _codecs:
+        if codec not in _CODEC_LOADERS:
+            raise ValueError(
+                f"Unsupported compression codec {codec}, it should be one of "
+                f"{[NONE] + list(_CODEC_LOADERS)}."
+            )
+        _codecs[codec] = _CODEC_LOADERS[codec]()
+    return _codecs[codec]
+
+
+def check_codec(codec):
+    """Raise an error if the codec is unknown or its library is missing."""
+    if codec and codec != NONE:
+        _get_codec(codec)
+
+
+def get_compression_threshold(threshold=None):
+    if threshold is None:
+        threshold = _COMPRESSION_THRESHOLD
+    return threshold
+
+
+def compress(data, codec, threshold):
+    """Compress the data if it's not smaller than the threshold.
+
+    Returns:
+        A tuple of the codec actually used and the (compressed) data.
+    """
+    if not codec or codec == NONE or len(data) < threshold:
+        return NONE, data
+    compress_func, _ = _get_codec(codec)
+    return codec, compress_func(data)
+
+
+def decompress(data, codec):
+    if not codec or codec == NONE:
+        return data
+    _, decompress_func = _get_codec(codec)
+    return decompress_func(data)
@@ -0,0 +1,107 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The content-addressed dedup of the cross-silo data.
+
+The sender remembers the hashes of the data recently sent to each party,
+and the receiver caches the data by their hashes. If the same bytes are
+sent again, only the hash is sent, and the receiver gets the data from its
+cache. If the receiver has evicted it, the sender sends the data again.
+"""
+
+import collections
+import hashlib
+
+_CONTENT_DEDUP_POLICY = {
+    # The data smaller than this is not deduplicated.
+    "min_bytes": 64 * 1024,
+    # The number of hashes the sender remembers for each party.
+    "index_size": 1024,
+    # The max bytes of the data the receiver caches.
+    "cache_bytes": 256 * 1024 * 1024,
+}
+
+
+def get_content_dedup_policy(content_dedup_policy=None):
+    """Returns None if the dedup is disabled."""
+    if not content_dedup_policy:
+        return None
+    policy = dict(_CONTENT_DEDUP_POLICY)
+    policy.update(content_dedup_policy)
+    return policy
+
+
+def hash_frames(frames):
+    hasher = hashlib.blake2b(digest_size=16)
+    for frame in frames:
+        hasher.update(frame)
+    return hasher.hexdigest()
+
+
+class SentContentIndex:
+    """The hashes of the data recently sent to each party."""
+
+    def __init__(self, index_size) -> None:
+        self._index_size = index_size
+        # Map from the party to an ordered set of the hashes, the least
+        # recently used first.
+        self._hashes = collections.defaultdict(collections.OrderedDict)
+
+    def contains(self, party, content_hash):
+        hashes = self._hashes[party]
+        if content_hash not in hashes:
+            return False
+        hashes.move_to_end(content_hash)
+        return True
+
+    def add(self, party, content_hash):
+        hashes = self._hashes[party]
+        hashes[content_hash] = None
+        hashes.move_to_end(content_hash)
+        while len(hashes) > self._index_size:
+            hashes.popitem(last=False)
+
+    def discard(self, party, content_hash):
+        self._hashes[party].pop(content_hash, None)
+
+
+class ContentCache:
+    """The LRU cache of the received data keyed by their hashes and codecs."""
+
+    def __init__(self, cache_bytes) -> None:
+        self._cache_bytes = cache_bytes
+        # Map from the key to a tuple of the value and its size, the least
+        # recently used first.
+        self._entries = collections.OrderedDict()
+        self.cached_bytes = 0
+
+    def get(self, key):
+        """Returns None if it's not cached."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, value, size):
+        if size > self._cache_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.cached_bytes -= old[1]
+        self._entries[key] = (value, size)
+        self.cached_bytes += size
+        while self.cached_bytes > self._cache_bytes:
+            _, (_, evicted_size) = self._entries.popitem(last=False)
+            self.cached_bytes -= evicted_size
@@ -0,0 +1,100 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import concurrent.futures
+import logging
+
+import fed._private.compression as fed_compression
+
+logger = logging.getLogger(__name__)
+
+# The max bytes of the decoded data waiting for the consumers.
+_EAGER_DECODING_BUDGET = 256 * 1024 * 1024
+
+
+def get_eager_decoding_budget(budget=None):
+    if budget is None:
+        budget = _EAGER_DECODING_BUDGET
+    return budget
+
+
+class EagerDecoder:
+    """Decompress the received data in background as soon as it arrives.
+
+    So the decompression is done before the consumer asks for the data,
+    rather than on its critical path. The decoded data waiting for the
+    consumers is limited by `budget` bytes, the data arrives beyond that is
+    kept compressed and decompressed by the consumer as usual.
+
+    Note that this should be used in the asyncio event loop of the actor.
+    """
+
+    def __init__(self, budget=None, max_workers=None) -> None:
+        self._budget = get_eager_decoding_budget(budget)
+        self._executor = None
+        if self._budget > 0:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="fed-decoding"
+            )
+        self._used = 0
+
+    def submit(self, data, codec):
+        """Start decoding the data if the budget allows.
+
+        Returns:
+            A tuple of the data or the future of the decoded data, and the
+            codec the data is still encoded with.
+        """
+        if (
+            self._executor is None
+            or not codec
+            or codec == fed_compression.NONE
+            or self._used >= self._budget
+        ):
+            return data, codec
+        # Reserve the compressed size, it's corrected once decoded.
+        self._used += len(data)
+        future = asyncio.get_event_loop().run_in_executor(
+            self._executor, fed_compression.decompress, data, codec
+        )
+        future.add_done_callback(
+            lambda f, reserved=len(data): self._on_decoded(f, reserved)
+        )
+        return future, fed_compression.NONE
+
+    def _on_decoded(self, future, reserved):
+        self._used -= reserved
+        if not future.cancelled() and future.exception() is None:
+            self._used += len(future.result())
+
+    async def result(self, data):
+        """Get the decoded data and release its budget."""
+        if not isinstance(data, asyncio.Future):
+            return data
+        data = await data
+        self._used -= len(data)
+        return data
+
+    def discard(self, data):
+        """Release the budget of the data which will never be consumed."""
+        if isinstance(data, asyncio.Future):
+            data.add_done_callback(self._on_discarded)
+
+    def _on_discarded(self, future):
+        if not future.cancelled() and future.exception() is None:
+            self._used -= len(future.result())
+
+    def get_stats(self):
+        return {"eager_decoding_bytes": self._used}
@@ -0,0 +1,54 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+# How often the event loop is checked.
+_CHECK_INTERVAL_S = 0.01
+
+
+class EventLoopMonitor:
+    """Measure how long the asyncio event loop is blocked.
+
+    A task wakes up every `interval_s`, and the lag beyond the interval is
+    the time the loop was blocked by other callbacks, e.g. the CPU bound
+    work running in the loop.
+    """
+
+    def __init__(self, interval_s=None) -> None:
+        self._interval_s = interval_s or _CHECK_INTERVAL_S
+        self._task = None
+        self.blocked_s = 0.0
+        self.max_blocked_s = 0.0
+
+    def start(self):
+        """Start monitoring the running loop, it's a no-op if started."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self._interval_s)
+            lag = time.monotonic() - start - self._interval_s
+            if lag > 0:
+                self.blocked_s += lag
+                self.max_blocked_s = max(self.max_blocked_s, lag)
+
+    def get_stats(self):
+        return {
+            "loop_blocked_s": self.blocked_s,
+            "loop_max_blocked_s": self.max_blocked_s,
+        }
@@ -17,9 +17,23 @@ import logging
 import ray
 from fed._private.fed_call_holder import FedCallHolder
 from fed.fed_object import FedObject
+from fed.utils import get_ray_options
 
 logger = logging.getLogger(__name__)
 
+# Map from the class to its ray actor class, which is built only once since
+# building it exports the class again.
+_ray_actor_classes = {}
+
+
+def _get_ray_actor_class(cls):
+    ray_actor_class = _ray_actor_classes.get(cls)
+    if ray_actor_class is None:
+        ray_actor_class = ray.remote(cls)
+        _ray_actor_classes[cls] = ray_actor_class
+    return ray_actor_class
+
+
 class FedActorHandle:
     def __init__(
         self,
@@ -37,21 +51,38 @@ class FedActorHandle:
         self._node_party = node_party
         self._options = options
         self._actor_handle = None
+        # Map from the method name and options to the `FedActorMethod`, so
+        # the repeated calls of the same method reuse it.
+        self._methods = {}
 
     def __getattr__(self, method_name: str):
         # User trying to call .bind() without a bind class method
         if method_name == "remote" and "remote" not in dir(self._body):
             raise AttributeError(f".remote() cannot be used again on {type(self)} ")
-        # Raise an error if the method is invalid.
-        getattr(self._body, method_name)
-        call_node = FedActorMethod(
-            self._cluster,
-            self._party,
-            self._node_party,
-            self,
-            method_name,
-        ).options(**self._options)
-        return call_node
+        return self._get_method(method_name, self._options)
+
+    def _get_method(self, method_name, options):
+        try:
+            key = (method_name, tuple(sorted(options.items())))
+            method = self._methods.get(key)
+        except TypeError:
+            # The options are not hashable, which is not cached.
+            key = None
+            method = None
+        if method is None:
+            # Raise an error if the method is invalid.
+            getattr(self._body, method_name)
+            method = FedActorMethod(
+                self._cluster,
+                self._party,
+                self._node_party,
+                self,
+                method_name,
+                options,
+            )
+            if key is not None:
+                self._methods[key] = method
+        return method
 
     def _execute_impl(self, cls_args, cls_kwargs):
         """Executor of ClassNode by ray.remote()
@@ -62,11 +93,11 @@ class FedActorHandle:
         current node is executed.
         """
         if self._node_party == self._party:
-            self._actor_handle = (
-                ray.remote(self._body)
-                .options(**self._options)
-                .remote(*cls_args, **cls_kwargs)
-            )
+            ray_actor_class = _get_ray_actor_class(self._body)
+            ray_options = get_ray_options(self._options)
+            if ray_options:
+                ray_actor_class = ray_actor_class.options(**ray_options)
+            self._actor_handle = ray_actor_class.remote(*cls_args, **cls_kwargs)
 
     def _execute_remote_method(self, method_name, options, args, kwargs):
         num_returns = 1
@@ -94,14 +125,22 @@ class FedActorMethod:
         node_party,
         fed_actor_handle,
         method_name,
+        options=None,
     ) -> None:
         self._cluster = cluster
         self._party = party  # Current party
         self._node_party = node_party
         self._fed_actor_handle = fed_actor_handle
         self._method_name = method_name
-        self._options = {}
-        self._fed_call_holder = FedCallHolder(node_party, self._execute_impl)
+        self._options = options or {}
+        self._fed_call_holder = FedCallHolder(
+            node_party,
+            self._execute_impl,
+            self._options,
+            name=f"{fed_actor_handle._body.__module__}."
+            f"{fed_actor_handle._body.__qualname__}.{method_name}"
+            f"@{fed_actor_handle._fed_class_task_id}",
+        )
 
 
     def remote(self, *args, **kwargs) -> FedObject:
@@ -109,9 +148,8 @@ class FedActorMethod:
 
 
     def options(self, **options):
-        self._options = options
-        self._fed_call_holder.options(**options)
-        return self
+        """Get the method with the options, which is also reused."""
+        return self._fed_actor_handle._get_method(self._method_name, options)
 
     def _execute_impl(self, args, kwargs):
         return self._fed_actor_handle._execute_remote_method(
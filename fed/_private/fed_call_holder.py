@@ -14,13 +14,9 @@
 
 import logging
 
-# Set config in the very beginning to avoid being overwritten by other packages
-logging.basicConfig(level=logging.INFO)
-
-import jax
-
 import fed
 from fed._private.global_context import get_global_context
+from fed._private.tree_util import find_instances
 from fed.barriers import send
 from fed.fed_object import FedObject
 from fed.utils import resolve_dependencies
@@ -39,11 +35,16 @@ it's a holder.
 
 """
 class FedCallHolder:
-    def __init__(self, node_party, submit_ray_task_func, options = {}) -> None:
+    def __init__(
+        self, node_party, submit_ray_task_func, options = {}, name=None
+    ) -> None:
         self._party = fed.get_party()
         self._node_party = node_party
         self._options = options
         self._submit_ray_task_func = submit_ray_task_func
+        # The name to identify the edges of the outputs if they are delta
+        # encoded, it should be the same in every round.
+        self._name = name
     
     def options(self, **options):
         self._options = options
@@ -58,24 +59,48 @@ class FedCallHolder:
             )
             # TODO(qwang): Handle kwargs.
             ray_obj_ref = self._submit_ray_task_func(resolved_args, resolved_kwargs)
+            delta_edge = None
+            quantization = None
+            if self._options:
+                if self._options.get("delta_encoding"):
+                    delta_edge = self._name
+                quantization = self._options.get("quantization")
             if isinstance(ray_obj_ref, list):
                 return [
-                    FedObject(self._node_party, fed_task_id, ref, i)
+                    FedObject(
+                        self._node_party,
+                        fed_task_id,
+                        ref,
+                        i,
+                        delta_edge,
+                        quantization,
+                    )
                     for i, ref in enumerate(ray_obj_ref)
                 ]
             else:
-                return FedObject(self._node_party, fed_task_id, ray_obj_ref)
+                return FedObject(
+                    self._node_party,
+                    fed_task_id,
+                    ray_obj_ref,
+                    delta_edge=delta_edge,
+                    quantization=quantization,
+                )
         else:
-            flattened_args, _ = jax.tree_util.tree_flatten((args, kwargs))
-            for arg in flattened_args:
+            for arg in find_instances((args, kwargs), FedObject):
                 # TODO(qwang): We still need to cosider kwargs and a deeply object_ref in this party.
-                if isinstance(arg, FedObject) and arg.get_party() == self._party:
+                if (
+                    arg.get_party() == self._party
+                    and not arg._was_sending_or_sent_to_party(self._node_party)
+                ):
+                    arg._mark_is_sending_to_party(self._node_party)
                     send(
                         self._node_party,
                         arg.get_ray_object_ref(),
                         arg.get_fed_task_id(),
                         fed_task_id,
                         self._node_party,
+                        delta_edge=arg._get_delta_edge(),
+                        quantization=arg._quantization,
                     )
             if (
                 self._options
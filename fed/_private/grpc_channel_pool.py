@@ -0,0 +1,166 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import contextlib
+import logging
+import time
+
+import grpc
+
+import fed.grpc as fed_grpc
+
+logger = logging.getLogger(__name__)
+
+# The max number of in-flight rpcs on a single channel. It's aligned with
+# the default `MAX_CONCURRENT_STREAMS` of a grpc server, the streams beyond
+# this will be queued by the server, so we'd better open a new channel.
+_GRPC_MAX_STREAMS_PER_CHANNEL = 100
+
+# The channels that have not been used for this many seconds will be closed.
+_GRPC_CHANNEL_IDLE_TIMEOUT_S = 600
+
+
+class _PooledChannel:
+    def __init__(self, channel) -> None:
+        self.channel = channel
+        self.stub = fed_grpc.fed_pb2_grpc.GrpcServiceStub(channel)
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+        # A broken channel accepts no new rpcs, and it will be closed once
+        # all of its in-flight rpcs are done.
+        self.broken = False
+
+    def is_available(self, max_streams):
+        if self.broken:
+            return False
+        if self.channel.get_state() == grpc.ChannelConnectivity.SHUTDOWN:
+            return False
+        return self.in_flight < max_streams
+
+
+class GrpcChannelPool:
+    """A pool of long-lived grpc channels to the other parties.
+
+    The channels (and the stubs on them) are keyed by the destination, so
+    that the messages to the same party reuse the established connections
+    rather than paying the TCP and TLS handshakes for every message. A new
+    channel is opened to a destination if all of its channels reach the
+    max number of concurrent streams, and the channels idle for a long time
+    are closed.
+
+    Note that this should be used in the asyncio event loop of the actor.
+    """
+
+    def __init__(
+        self,
+        grpc_options=None,
+        max_streams_per_channel=None,
+        idle_timeout_s=None,
+    ) -> None:
+        self._grpc_options = grpc_options
+        self._max_streams_per_channel = (
+            max_streams_per_channel or _GRPC_MAX_STREAMS_PER_CHANNEL
+        )
+        self._idle_timeout_s = idle_timeout_s or _GRPC_CHANNEL_IDLE_TIMEOUT_S
+        # Map from the key of destination to a list of `_PooledChannel`.
+        self._channels = {}
+        # The number of channels created so far, for the stats.
+        self.created_channels = 0
+        # Hold the tasks closing the evicted channels, otherwise they might
+        # be garbage collected before done.
+        self._closing_tasks = set()
+
+    def _create_channel(self, dest, credentials=None):
+        if credentials is not None:
+            return grpc.aio.secure_channel(
+                dest, credentials, options=self._grpc_options
+            )
+        return grpc.aio.insecure_channel(dest, options=self._grpc_options)
+
+    def _close_later(self, pooled):
+        task = asyncio.get_event_loop().create_task(pooled.channel.close())
+        self._closing_tasks.add(task)
+        task.add_done_callback(self._closing_tasks.discard)
+
+    def _evict(self):
+        now = time.monotonic()
+        for key in list(self._channels):
+            alive = []
+            for pooled in self._channels[key]:
+                if pooled.in_flight == 0 and (
+                    pooled.broken or now - pooled.last_used > self._idle_timeout_s
+                ):
+                    logger.debug(f"Closing the grpc channel to {key}.")
+                    self._close_later(pooled)
+                else:
+                    alive.append(pooled)
+            if alive:
+                self._channels[key] = alive
+            else:
+                self._channels.pop(key)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, key, dest, credentials_fn=None):
+        """Acquire a stub to `dest` for one rpc.
+
+        Args:
+            key: the key to identify the channels, the channels are shared
+                by the callers with the same key.
+            dest: the address of the destination.
+            credentials_fn: optional; a callable returns the channel
+                credentials, it's called only if a new channel is needed.
+        """
+        self._evict()
+        channels = self._channels.setdefault(key, [])
+        pooled = None
+        for candidate in channels:
+            if candidate.is_available(self._max_streams_per_channel):
+                pooled = candidate
+                break
+        if pooled is None:
+            credentials = credentials_fn() if credentials_fn else None
+            pooled = _PooledChannel(self._create_channel(dest, credentials))
+            channels.append(pooled)
+            self.created_channels += 1
+            logger.debug(
+                f"Created a new grpc channel to {dest}, {len(channels)} in total."
+            )
+
+        pooled.in_flight += 1
+        try:
+            yield pooled.stub
+        except grpc.aio.AioRpcError as e:
+            if e.code() == grpc.StatusCode.UNAVAILABLE:
+                # Reconnect with a new channel for the following rpcs.
+                pooled.broken = True
+            raise
+        finally:
+            pooled.in_flight -= 1
+            pooled.last_used = time.monotonic()
+
+    def invalidate(self):
+        """Retire all channels, the following rpcs will use new channels."""
+        for channels in self._channels.values():
+            for pooled in channels:
+                pooled.broken = True
+
+    async def close(self):
+        """Close all channels, including the evicted ones being closed."""
+        for channels in self._channels.values():
+            for pooled in channels:
+                await pooled.channel.close()
+        self._channels.clear()
+        if self._closing_tasks:
+            await asyncio.gather(*list(self._closing_tasks))
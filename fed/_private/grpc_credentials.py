@@ -0,0 +1,108 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import logging
+
+import grpc
+
+import fed.utils as fed_utils
+
+logger = logging.getLogger(__name__)
+
+
+def load_channel_credentials(tls_config, party):
+    ca_cert, private_key, cert_chain = fed_utils.load_client_certs(
+        tls_config, target_party=party
+    )
+    return grpc.ssl_channel_credentials(
+        certificate_chain=cert_chain,
+        private_key=private_key,
+        root_certificates=ca_cert,
+    )
+
+
+def _build_server_certificate_configuration(tls_config):
+    ca_cert, private_key, cert_chain = fed_utils.load_server_certs(tls_config)
+    return ca_cert, grpc.ssl_server_certificate_configuration(
+        [(private_key, cert_chain)], root_certificates=ca_cert
+    )
+
+
+class ClientCredentialsCache:
+    """The cache of the grpc channel credentials to the other parties.
+
+    The certs of all parties in `tls_config["client_certs"]` are loaded once
+    when the cache is created, rather than reading the cert files for every
+    message. Call `reload` after the cert files are rotated.
+    """
+
+    def __init__(self, tls_config) -> None:
+        self._tls_config = tls_config
+        # Map from party name to its `grpc.ChannelCredentials`.
+        self._credentials = {}
+        if fed_utils.tls_enabled(tls_config):
+            for party in tls_config["client_certs"]:
+                self._credentials[party] = load_channel_credentials(
+                    tls_config, party
+                )
+
+    def get(self, party):
+        if party not in self._credentials:
+            self._credentials[party] = load_channel_credentials(
+                self._tls_config, party
+            )
+        return self._credentials[party]
+
+    def reload(self):
+        for party in self._credentials:
+            self._credentials[party] = load_channel_credentials(
+                self._tls_config, party
+            )
+        logger.info(f"Reloaded the client certs of {list(self._credentials)}.")
+
+
+class ServerCredentialsLoader:
+    """The loader of the grpc server credentials.
+
+    The server certs are loaded once at startup. Calling `reload` loads the
+    cert files again and the new certs take effect for the following
+    handshakes, without restarting the grpc server.
+    """
+
+    def __init__(self, tls_config) -> None:
+        self._tls_config = tls_config
+        ca_cert, self._initial_config = _build_server_certificate_configuration(
+            tls_config
+        )
+        self._require_client_auth = ca_cert is not None
+        self._pending_config = None
+
+    def _fetch(self):
+        # This is called by grpc before each handshake, returning None means
+        # the certs are unchanged.
+        config, self._pending_config = self._pending_config, None
+        return config
+
+    def server_credentials(self):
+        return grpc.dynamic_ssl_server_credentials(
+            self._initial_config,
+            self._fetch,
+            require_client_authentication=self._require_client_auth,
+        )
+
+    def reload(self):
+        _, self._pending_config = _build_server_certificate_configuration(
+            self._tls_config
+        )
+        logger.info("Reloaded the server certs.")
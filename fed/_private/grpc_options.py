@@ -27,6 +27,19 @@ _GRPC_SERVICE = "GrpcService"
 _GRPC_MAX_SEND_MESSAGE_LENGTH = 500 * 1024 * 1024
 _GRPC_MAX_RECEIVE_MESSAGE_LENGTH = 500 * 1024 * 1024
 
+# The data larger than this will be sent in chunks of this size.
+_GRPC_CHUNK_SIZE = 32 * 1024 * 1024
+
+_GRPC_BATCHING_POLICY = {
+    # The max time to wait for more messages to the same party before
+    # sending a batch, 0 means sending every message alone. Every small
+    # message may be delayed by up to this, so it's disabled by default.
+    "window_us": 0,
+    # The max total size of the messages in one batch, the larger messages
+    # are sent alone.
+    "max_bytes": 1024 * 1024,
+}
+
 
 def get_grpc_options(
     retry_policy=None, max_send_message_length=None, max_receive_message_length=None
@@ -62,3 +75,19 @@ def get_grpc_options(
             ),
         ),
     ]
+
+
+def get_grpc_chunk_size(chunk_size=None):
+    if not chunk_size:
+        chunk_size = _GRPC_CHUNK_SIZE
+    assert (
+        chunk_size < _GRPC_MAX_SEND_MESSAGE_LENGTH
+    ), f"The chunk size should be less than {_GRPC_MAX_SEND_MESSAGE_LENGTH}."
+    return chunk_size
+
+
+def get_grpc_batching_policy(batching_policy=None):
+    policy = dict(_GRPC_BATCHING_POLICY)
+    if batching_policy:
+        policy.update(batching_policy)
+    return policy
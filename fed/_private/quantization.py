@@ -0,0 +1,107 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The lossy quantization of the float arrays in the cross-silo data.
+
+The float32/float64 numpy arrays are quantized when they are serialized,
+and dequantized back to their dtypes when they are deserialized by the
+receiver, so it's transparent to the consumers except the precision lost.
+
+- `fp16`: half precision, scaled down if out of its range. 2x smaller for
+  float32.
+- `bf16`: the higher 16 bits of float32, which keeps the range of float32
+  but only 8 bits of precision. 2x smaller for float32.
+- `int8`: linearly quantized into [-127, 127] by a scale of the max
+  absolute value. 4x smaller for float32. int8 can't represent NaN or
+  infinity, so the arrays with any of them fall back to `fp16`, which
+  keeps them, rather than being silently zeroed or clipped.
+"""
+
+FP16 = "fp16"
+BF16 = "bf16"
+INT8 = "int8"
+
+_QUANTIZATIONS = [FP16, BF16, INT8]
+
+# The max of float16, i.e. `np.finfo(np.float16).max`.
+_FP16_MAX = 65504.0
+
+_INT8_MAX = 127
+
+
+def check_quantization(quantization):
+    if quantization and quantization not in _QUANTIZATIONS:
+        raise ValueError(
+            f"Unsupported quantization {quantization}, it should be one of "
+            f"{_QUANTIZATIONS}."
+        )
+
+
+def _max_abs(array):
+    """The max absolute value of the finite elements."""
+    import numpy as np
+
+    if array.size == 0:
+        return 0.0
+    max_abs = float(np.max(np.abs(array)))
+    if not np.isfinite(max_abs):
+        max_abs = float(np.max(np.abs(array[np.isfinite(array)]), initial=0))
+    return max_abs
+
+
+def quantize(array, quantization):
+    """Quantize the float array.
+
+    Returns:
+        The arguments of `dequantize` to rebuild the array.
+    """
+    import numpy as np
+
+    scale = 1.0
+    if quantization == FP16:
+        max_abs = _max_abs(array)
+        if max_abs > _FP16_MAX:
+            scale = max_abs / _FP16_MAX
+            array = array / scale
+        quantized = array.astype(np.float16)
+    elif quantization == BF16:
+        bits = array.astype(np.float32, order="C", copy=False).view(np.uint32)
+        # Round to the nearest even rather than truncating.
+        rounded = (bits + 0x7FFF + ((bits >> 16) & 1)) >> 16
+        quantized = rounded.astype(np.uint16)
+        quantized[np.isnan(array)] = 0x7FC0
+    elif quantization == INT8:
+        if not np.isfinite(array).all():
+            return quantize(array, FP16)
+        max_abs = _max_abs(array)
+        if max_abs > 0:
+            scale = max_abs / _INT8_MAX
+        quantized = np.clip(np.rint(array / scale), -_INT8_MAX, _INT8_MAX).astype(
+            np.int8
+        )
+    else:
+        check_quantization(quantization)
+    return quantization, quantized, scale, array.dtype.str
+
+
+def dequantize(quantization, quantized, scale, dtype):
+    import numpy as np
+
+    if quantization == BF16:
+        array = (quantized.astype(np.uint32) << 16).view(np.float32)
+    else:
+        array = quantized.astype(np.float32)
+    if scale != 1.0:
+        array = array * scale
+    return array.astype(dtype, copy=False)
@@ -0,0 +1,107 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import time
+
+
+def rendezvous_key(upstream_seq_id, downstream_seq_id):
+    # The seq ids are strings on the wire.
+    return (str(upstream_seq_id), str(downstream_seq_id))
+
+
+class RendezvousTable:
+    """Where the received data meets the consumer waiting for it.
+
+    Either the data or the consumer may come first, they meet at a future
+    keyed by `(upstream_seq_id, downstream_seq_id)`: `put` sets its result
+    and `claim` awaits it, the entry is removed once claimed. The entries
+    never claimed or never put can be found by `stale_entries`, and removed
+    by `evict`.
+
+    Note that this should be used in the asyncio event loop of the actor,
+    there is no lock since the grpc server runs in the same loop.
+    """
+
+    def __init__(self) -> None:
+        self._futures = {}
+        # Map from the key to the size of its data not claimed yet.
+        self._sizes = {}
+        # Map from the key to the time its entry is created.
+        self._create_times = {}
+        self.queued_bytes = 0
+
+    def __len__(self):
+        return len(self._futures)
+
+    def _get_future(self, key):
+        future = self._futures.get(key)
+        if future is None:
+            future = asyncio.get_event_loop().create_future()
+            self._futures[key] = future
+            self._create_times[key] = time.monotonic()
+        return future
+
+    def put(self, key, value, size=0):
+        """Set the value of the key.
+
+        Returns:
+            False if the value of the key is already put and not claimed,
+            e.g. the data is sent again by the sender, then this value is
+            dropped. The future is not replaced, since a consumer may be
+            resuming from it.
+        """
+        future = self._get_future(key)
+        if future.done():
+            return False
+        future.set_result(value)
+        self._sizes[key] = size
+        self.queued_bytes += size
+        return True
+
+    async def claim(self, key):
+        future = self._get_future(key)
+        try:
+            return await future
+        finally:
+            if self._futures.get(key) is future:
+                self._pop(key)
+
+    def _pop(self, key):
+        self._create_times.pop(key)
+        self.queued_bytes -= self._sizes.pop(key, 0)
+        return self._futures.pop(key)
+
+    def stale_entries(self, older_than_s):
+        """List the entries created more than `older_than_s` seconds ago.
+
+        Returns:
+            A list of tuples of the key, the age in seconds, and the value
+            put, or None if it's a consumer waiting for the data.
+        """
+        now = time.monotonic()
+        entries = []
+        for key, create_time in self._create_times.items():
+            age = now - create_time
+            if age > older_than_s:
+                future = self._futures[key]
+                value = future.result() if future.done() else None
+                entries.append((key, age, value))
+        return entries
+
+    def evict(self, key, exception):
+        """Remove the entry, the waiting consumer gets the `exception`."""
+        future = self._pop(key)
+        if not future.done():
+            future.set_exception(exception)
@@ -12,14 +12,162 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-import yaml
+import functools
 import io
+import pickle
+import struct
+import sys
 import cloudpickle
 import fed
+import fed._private.compression as fed_compression
+import fed._private.quantization as fed_quantization
+import fed._private.sparse as fed_sparse
 
 import ray.experimental.internal_kv as internal_kv
 
+# The compiled allowed list, None means everything is allowed.
 _pickle_whitelist = None
+_pickle_whitelist_loaded = False
+# The max number of the memoized decisions of the allowed list. The globals
+# are named by the pickles from the peers, so the memo should be bounded.
+_FIND_CLASS_DECISIONS_SIZE = 4096
+
+_FRAMES_NUM = struct.Struct("<I")
+_FRAME_SIZE = struct.Struct("<Q")
+
+# The globals of rayfed allowed to be loaded no matter the allowed list, to
+# decode the data encoded by rayfed.
+_TRUSTED_GLOBALS = {
+    ("fed._private.quantization", "dequantize"),
+    ("fed._private.sparse", "rebuild_dense"),
+    ("fed._private.sparse", "SparseArray"),
+}
+
+
+class _EncodingPickler(cloudpickle.CloudPickler):
+    """The pickler encoding the numpy arrays in the compact formats."""
+
+    def __init__(self, file, quantization=None, sparsity_threshold=None, **kwargs):
+        super().__init__(file, **kwargs)
+        self._quantization = quantization
+        self._sparsity_threshold = sparsity_threshold
+
+    def reducer_override(self, obj):
+        import numpy as np
+
+        if type(obj) is np.ndarray:
+            if self._sparsity_threshold:
+                sparse = fed_sparse.to_sparse(obj, self._sparsity_threshold)
+                if sparse is not None:
+                    # The values are quantized if needed when pickled.
+                    return fed_sparse.rebuild_dense, (
+                        obj.shape,
+                        obj.dtype.str,
+                        *sparse,
+                    )
+            if self._quantization and obj.dtype in (np.float32, np.float64):
+                return fed_quantization.dequantize, fed_quantization.quantize(
+                    obj, self._quantization
+                )
+        return super().reducer_override(obj)
+
+
+def dumps_frames(data, quantization=None, sparsity_threshold=None):
+    """Serialize the data into frames with pickle protocol 5.
+
+    The large buffers (e.g. numpy arrays) are not copied into the pickle
+    stream, but kept as separate out-of-band frames referring to the memory
+    of the data. The frames are laid out as:
+
+        | num of frames | size of each frame | pickle stream | buffers... |
+
+    Args:
+        quantization: optional; the lossy quantization of the float arrays,
+            see `fed._private.quantization`.
+        sparsity_threshold: optional; the arrays with more zeros than this
+            ratio are encoded in the sparse format, see `fed._private.sparse`.
+
+    Returns:
+        A list of bytes-like objects, which concatenated is the serialized
+        data.
+    """
+    buffers = []
+    if quantization or sparsity_threshold:
+        file = io.BytesIO()
+        _EncodingPickler(
+            file,
+            quantization,
+            sparsity_threshold,
+            protocol=5,
+            buffer_callback=buffers.append,
+        ).dump(data)
+        pickled = file.getvalue()
+    else:
+        pickled = cloudpickle.dumps(
+            data, protocol=5, buffer_callback=buffers.append
+        )
+    frames = [memoryview(pickled)] + [buffer.raw() for buffer in buffers]
+    header = bytearray(_FRAMES_NUM.pack(len(frames)))
+    for frame in frames:
+        header += _FRAME_SIZE.pack(frame.nbytes)
+    return [header] + frames
+
+
+def loads_frames(serialized_data, loads=None):
+    """Deserialize the data serialized by `dumps_frames`.
+
+    The out-of-band buffers are rebuilt upon the memory of `serialized_data`
+    without copying, so the arrays are read-only if it's a `bytes`.
+
+    Args:
+        loads: optional; the function to load the pickle stream, defaults to
+            `cloudpickle.loads`.
+    """
+    view = memoryview(serialized_data)
+    (num_frames,) = _FRAMES_NUM.unpack_from(view)
+    offset = _FRAMES_NUM.size + num_frames * _FRAME_SIZE.size
+    frames = []
+    for i in range(num_frames):
+        (size,) = _FRAME_SIZE.unpack_from(
+            view, _FRAMES_NUM.size + i * _FRAME_SIZE.size
+        )
+        frames.append(view[offset : offset + size])
+        offset += size
+    loads = loads or cloudpickle.loads
+    return loads(frames[0], buffers=frames[1:])
+
+
+if sys.version_info.minor >= 8:
+    _Unpickler = pickle.Unpickler
+else:
+    import pickle5
+
+    _Unpickler = pickle5.Unpickler
+
+
+class _RestrictedUnpickler(_Unpickler):
+    def find_class(self, module, name):
+        if _is_allowed(module, name):
+            return super().find_class(module, name)
+
+        # Forbid everything else.
+        raise pickle.UnpicklingError("global '%s.%s' is forbidden" % (module, name))
+
+
+@functools.lru_cache(maxsize=_FIND_CLASS_DECISIONS_SIZE)
+def _is_allowed(module, name):
+    if _pickle_whitelist is None or (
+        module in _pickle_whitelist
+        and (_pickle_whitelist[module] is None or name in _pickle_whitelist[module])
+    ):
+        return True
+
+    if (module, name) in _TRUSTED_GLOBALS:
+        return True
+
+    if module == "fed._private": # TODO(qwang): Not sure if it works.
+        return True
+    return False
 
 
 def _restricted_loads(
@@ -30,51 +178,84 @@ def _restricted_loads(
     errors="strict",
     buffers=None,
 ):
-    from sys import version_info
-    assert version_info.major == 3
+    if isinstance(serialized_data, str):
+        raise TypeError("Can't load pickle from unicode string")
+    file = io.BytesIO(serialized_data)
+    return _RestrictedUnpickler(
+        file, fix_imports=fix_imports, buffers=buffers, encoding=encoding, errors=errors
+    ).load()
+
 
-    if version_info.minor >= 8:
-        import pickle as pickle
+def _set_pickle_whitelist(whitelist):
+    """Compile the allowed list into a dict of module to the set of names.
+
+    The names are None if all of the module is allowed.
+    """
+    global _pickle_whitelist, _pickle_whitelist_loaded
+
+    if whitelist is None or "*" in whitelist:
+        _pickle_whitelist = None
     else:
-        import pickle5 as pickle
+        _pickle_whitelist = {
+            module: None if "*" in attr_list else frozenset(attr_list)
+            for module, attr_list in whitelist.items()
+        }
+    _is_allowed.cache_clear()
+    _pickle_whitelist_loaded = True
 
-    class RestrictedUnpickler(pickle.Unpickler):
-        def find_class(self, module, name):
-            if _pickle_whitelist is None or (
-                module in _pickle_whitelist
-                and (_pickle_whitelist[module] is None or name in _pickle_whitelist[module])
-            ):
-                return super().find_class(module, name)
 
-            if module == "fed._private": # TODO(qwang): Not sure if it works.
-                return super().find_class(module, name)
+def _load_pickle_whitelist():
+    """Load the allowed list of cross-silo deserialization.
 
-            # Forbid everything else.
-            raise pickle.UnpicklingError("global '%s.%s' is forbidden" % (module, name))
+    It's loaded from the internal kv only once in each process, until it's
+    reset by `reset_pickle_whitelist`.
 
-    if isinstance(serialized_data, str):
-        raise TypeError("Can't load pickle from unicode string")
-    file = io.BytesIO(serialized_data)
-    return RestrictedUnpickler(
-        file, fix_imports=fix_imports, buffers=buffers, encoding=encoding, errors=errors
-    ).load()
+    Returns:
+        Whether the deserialization is restricted by the allowed list.
+    """
+    if not _pickle_whitelist_loaded:
+        from fed._private.constants import (
+            RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST,
+        )
 
+        serialized = internal_kv._internal_kv_get(
+            RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST
+        )
+        _set_pickle_whitelist(
+            cloudpickle.loads(serialized) if serialized is not None else None
+        )
+    return _pickle_whitelist is not None
 
-def _apply_loads_function_with_whitelist():
-    global _pickle_whitelist
 
-    from fed._private.constants import RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST
-    serialized = internal_kv._internal_kv_get(RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST)
-    if serialized is None:
-        return
+def reset_pickle_whitelist():
+    """Load the allowed list again next time, e.g. it's changed by `fed.init`."""
+    global _pickle_whitelist, _pickle_whitelist_loaded
 
-    _pickle_whitelist = cloudpickle.loads(serialized)
-    if _pickle_whitelist is None:
-        return
+    _pickle_whitelist = None
+    _pickle_whitelist_loaded = False
+    _is_allowed.cache_clear()
 
-    if "*" in _pickle_whitelist:
-        _pickle_whitelist = None
-    for module, attr_list in _pickle_whitelist.items():
-        if "*" in attr_list:
-            _pickle_whitelist[module] = None
-    cloudpickle.loads = _restricted_loads
+
+def _loads_received_data(data, codec):
+    # NOTE: This is called when the data is deserialized from the object
+    # store, so it runs in the worker consuming the data.
+    data = fed_compression.decompress(memoryview(data), codec)
+    loads = _restricted_loads if _load_pickle_whitelist() else None
+    return loads_frames(data, loads=loads)
+
+
+class ReceivedData:
+    """The raw bytes of the data received from the other party.
+
+    The recver proxy returns it as is, rather than deserializing the data
+    and letting Ray serialize it again into the object store. The bytes are
+    put into the object store as an out-of-band buffer, and they are decoded
+    with the allowed list only once in the worker consuming the data.
+    """
+
+    def __init__(self, data, codec) -> None:
+        self._data = data
+        self._codec = codec
+
+    def __reduce__(self):
+        return _loads_received_data, (pickle.PickleBuffer(self._data), self._codec)
@@ -0,0 +1,65 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The executors to serialize (and compress) the cross-silo data.
+
+The serialization is CPU bound, running it in the event loop of the proxy
+actor blocks all of the other in-flight messages, so it's offloaded to an
+executor by default.
+"""
+
+import concurrent.futures
+import multiprocessing
+
+THREAD = "thread"
+PROCESS = "process"
+NONE = "none"
+
+_SERIALIZING_POLICY = {
+    # Where to serialize the data, could be `thread`, `process` or `none`,
+    # `none` means serializing in the event loop.
+    "executor": THREAD,
+    # The max number of workers of the executor, None means the default of
+    # the python executor.
+    "max_workers": None,
+}
+
+
+def get_serializing_policy(serializing_policy=None):
+    policy = dict(_SERIALIZING_POLICY)
+    if serializing_policy:
+        policy.update(serializing_policy)
+    if policy["executor"] not in (THREAD, PROCESS, NONE):
+        raise ValueError(
+            f"Unsupported serializing executor {policy['executor']}, it should "
+            f"be one of {[THREAD, PROCESS, NONE]}."
+        )
+    return policy
+
+
+def create_executor(serializing_policy):
+    """Create the executor of the policy, returns None for `none`."""
+    executor = serializing_policy["executor"]
+    max_workers = serializing_policy["max_workers"]
+    if executor == THREAD:
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="fed-serializing"
+        )
+    if executor == PROCESS:
+        # Don't fork the actor process, which has grpc and ray threads.
+        return concurrent.futures.ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return None
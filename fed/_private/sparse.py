@@ -0,0 +1,129 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""The sparse wire format of the mostly-zero arrays.
+
+A sparse array is sent as the flat indices and the values of its non-zero
+elements. There are two ways to send an array in the sparse format:
+
+- Wrap it by `SparseArray`, which is sent as is and received as a
+  `SparseArray`, the dense array is only rebuilt by `todense()` on demand.
+- Set a sparsity threshold, then the numpy arrays with more zeros than the
+  threshold are detected when serialized, and rebuilt into dense arrays
+  when the receiver deserializes them.
+
+Like the other encodings, numpy is only imported when an array is encoded
+or decoded, to keep it out of `import fed`.
+"""
+
+# The arrays smaller than this are not checked for the sparsity.
+_SPARSE_MIN_SIZE = 1024
+
+# The kinds of the dtypes that are checked for the sparsity, i.e. the bool,
+# integer and floating point ones, but not the structured, string, datetime
+# or object ones, whose zeros can't be counted or aren't worth skipping.
+_SPARSE_DTYPE_KINDS = "biufc"
+
+_INT32_MAX = 2**31 - 1
+
+
+def check_sparsity_threshold(threshold):
+    if threshold is not None and not 0 < threshold < 1:
+        raise ValueError(
+            f"The sparsity threshold should be between 0 and 1, got {threshold}."
+        )
+
+
+def _index_dtype(size):
+    import numpy as np
+
+    return np.int32 if size <= _INT32_MAX else np.int64
+
+
+def to_sparse(array, threshold):
+    """Get the indices and values of the array if it's sparse enough.
+
+    Returns:
+        A tuple of the indices and values, or None if the ratio of zeros in
+        the array is below the threshold, or the array isn't numeric.
+    """
+    import numpy as np
+
+    if array.size < _SPARSE_MIN_SIZE or array.dtype.kind not in _SPARSE_DTYPE_KINDS:
+        return None
+    nnz = np.count_nonzero(array)
+    if nnz > array.size * (1 - threshold):
+        return None
+    indices = np.flatnonzero(array).astype(_index_dtype(array.size))
+    return indices, array.reshape(-1)[indices]
+
+
+def rebuild_dense(shape, dtype, indices, values):
+    import numpy as np
+
+    array = np.zeros(shape, dtype=dtype)
+    array.reshape(-1)[indices] = values
+    return array
+
+
+class SparseArray:
+    """An array sent as the indices and values of its non-zero elements.
+
+    Args:
+        indices: the flat indices of the non-zero elements.
+        values: the values of the non-zero elements.
+        shape: the shape of the dense array.
+    """
+
+    def __init__(self, indices, values, shape) -> None:
+        import numpy as np
+
+        self.indices = np.asarray(indices)
+        self.values = np.asarray(values)
+        self.shape = tuple(shape)
+        self._dense = None
+
+    @classmethod
+    def from_dense(cls, array):
+        import numpy as np
+
+        array = np.asarray(array)
+        indices = np.flatnonzero(array).astype(_index_dtype(array.size))
+        return cls(indices, array.reshape(-1)[indices], array.shape)
+
+    @property
+    def dtype(self):
+        return self.values.dtype
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def todense(self):
+        """Rebuild the dense array, which is cached once rebuilt."""
+        if self._dense is None:
+            self._dense = rebuild_dense(
+                self.shape, self.dtype, self.indices, self.values
+            )
+        return self._dense
+
+    def __array__(self, dtype=None):
+        dense = self.todense()
+        return dense if dtype is None else dense.astype(dtype, copy=False)
+
+    def __reduce__(self):
+        return SparseArray, (self.indices, self.values, self.shape)
+
+    def __repr__(self):
+        return f"SparseArray(shape={self.shape}, dtype={self.dtype}, nnz={self.nnz})"
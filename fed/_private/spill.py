@@ -0,0 +1,104 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+import logging
+import mmap
+import os
+import shutil
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+_SPILL_POLICY = {
+    # The received data is spilled to disk if the bytes of the data waiting
+    # for the consumers in memory exceed this, None means never spilling.
+    "watermark_bytes": None,
+    # The directory to write the spilled data, None means the default
+    # temporary directory.
+    "spill_dir": None,
+}
+
+
+def get_spill_policy(spill_policy=None):
+    policy = dict(_SPILL_POLICY)
+    if spill_policy:
+        policy.update(spill_policy)
+    return policy
+
+
+class SpilledData:
+    """The received data spilled to a file."""
+
+    def __init__(self, path, size) -> None:
+        self.path = path
+        self.size = size
+
+    def load(self):
+        """Map the file into memory and remove it.
+
+        The pages are read from the disk lazily, and the mapping stays valid
+        after the file is removed until it's garbage collected.
+        """
+        with open(self.path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        os.unlink(self.path)
+        return data
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class SpillStore:
+    """Spill the received data not consumed for long to local files.
+
+    Note that this should be used in the asyncio event loop of the actor.
+    """
+
+    def __init__(self, watermark_bytes, party, spill_dir=None) -> None:
+        self.watermark_bytes = watermark_bytes
+        self._spill_dir = tempfile.mkdtemp(
+            prefix=f"rayfed-spill-{party}-", dir=spill_dir
+        )
+        self._next_id = 0
+        # The bytes of the spilled data not loaded yet.
+        self.spilled_bytes = 0
+
+    def should_spill(self, queued_bytes, size):
+        return size > 0 and queued_bytes + size > self.watermark_bytes
+
+    def _write(self, path, data):
+        with open(path, "wb") as f:
+            f.write(data)
+
+    async def spill(self, data):
+        path = os.path.join(self._spill_dir, str(self._next_id))
+        self._next_id += 1
+        # Don't block the event loop by the disk writing.
+        await asyncio.get_event_loop().run_in_executor(None, self._write, path, data)
+        self.spilled_bytes += len(data)
+        logger.debug(f"Spilled {len(data)} bytes to {path}.")
+        return SpilledData(path, len(data))
+
+    def load(self, spilled):
+        self.spilled_bytes -= spilled.size
+        return spilled.load()
+
+    def remove(self, spilled):
+        self.spilled_bytes -= spilled.size
+        spilled.remove()
+
+    def close(self):
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
@@ -0,0 +1,139 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Find and replace the objects of a type in the nested arguments.
+
+The containers are the same as `jax.tree_util`: list, tuple, namedtuple,
+dict, OrderedDict and defaultdict, and everything else is a leaf. Unlike
+flattening and unflattening the whole tree, the containers without any
+object replaced are kept as is rather than rebuilt.
+"""
+
+import collections
+
+_LIST = 1
+_TUPLE = 2
+_NAMEDTUPLE = 3
+_DICT = 4
+_DEFAULTDICT = 5
+_UNKNOWN = object()
+
+# The common leaves which are never replaced.
+_ATOMIC_TYPES = frozenset([int, float, bool, complex, str, bytes, type(None)])
+
+# Map from the type to its kind of container, None for the leaves.
+_container_kinds = {
+    list: _LIST,
+    tuple: _TUPLE,
+    dict: _DICT,
+    collections.OrderedDict: _DICT,
+    collections.defaultdict: _DEFAULTDICT,
+    **{atomic_type: None for atomic_type in _ATOMIC_TYPES},
+}
+
+
+def _container_kind(obj_type):
+    kind = _container_kinds.get(obj_type, _UNKNOWN)
+    if kind is _UNKNOWN:
+        kind = None
+        if issubclass(obj_type, tuple) and hasattr(obj_type, "_fields"):
+            kind = _NAMEDTUPLE
+        _container_kinds[obj_type] = kind
+    return kind
+
+
+def _children(obj, kind):
+    if kind == _DICT or kind == _DEFAULTDICT:
+        return obj.values()
+    return obj
+
+
+def find_instances(tree, cls):
+    """Get the list of the objects of `cls` in the tree, in depth-first order."""
+    kind = _container_kind(type(tree))
+    if kind is None:
+        return [tree] if isinstance(tree, cls) else []
+    found = []
+    _find(tree, kind, cls, found)
+    return found
+
+
+def _find(obj, kind, cls, found):
+    # The leaves are checked inline rather than by a recursive call, which
+    # is most of the time.
+    for child in _children(obj, kind):
+        if type(child) in _ATOMIC_TYPES:
+            continue
+        child_kind = _container_kinds.get(type(child), _UNKNOWN)
+        if child_kind is _UNKNOWN:
+            child_kind = _container_kind(type(child))
+        if child_kind is None:
+            if isinstance(child, cls):
+                found.append(child)
+        else:
+            _find(child, child_kind, cls, found)
+
+
+def replace_instances(tree, cls, func):
+    """Replace every object of `cls` in the tree by `func(obj)`.
+
+    Returns:
+        The tree replaced, the containers without any object replaced are
+        not copied.
+    """
+    kind = _container_kind(type(tree))
+    if kind is None:
+        return func(tree) if isinstance(tree, cls) else tree
+    return _replace(tree, kind, cls, func)
+
+
+def _replace_child(child, cls, func):
+    kind = _container_kinds.get(type(child), _UNKNOWN)
+    if kind is _UNKNOWN:
+        kind = _container_kind(type(child))
+    if kind is None:
+        return func(child) if isinstance(child, cls) else child
+    return _replace(child, kind, cls, func)
+
+
+def _replace(obj, kind, cls, func):
+    if kind == _DICT or kind == _DEFAULTDICT:
+        items = None
+        for key, value in obj.items():
+            new_value = _replace_child(value, cls, func)
+            if new_value is not value:
+                if items is None:
+                    items = dict(obj)
+                items[key] = new_value
+        if items is None:
+            return obj
+        if kind == _DEFAULTDICT:
+            return type(obj)(obj.default_factory, items)
+        return type(obj)(items)
+    children = None
+    for i, child in enumerate(obj):
+        if type(child) in _ATOMIC_TYPES:
+            continue
+        new_child = _replace_child(child, cls, func)
+        if new_child is not child:
+            if children is None:
+                children = list(obj)
+            children[i] = new_child
+    if children is None:
+        return obj
+    if kind == _LIST:
+        return children
+    if kind == _NAMEDTUPLE:
+        return type(obj)(*children)
+    return tuple(children)
@@ -34,13 +34,26 @@ from fed._private.constants import (
 from fed._private.fed_actor import FedActorHandle
 from fed._private.fed_call_holder import FedCallHolder
 from fed._private.global_context import get_global_context
-from fed.barriers import recv, send, start_recv_proxy, start_send_proxy
+from fed._private.serialization_utils import reset_pickle_whitelist
+from fed.barriers import (
+    broadcast,
+    recv,
+    start_recv_proxy,
+    start_send_proxy,
+    stop_recv_proxy,
+    stop_send_proxy,
+)
 from fed.cleanup import set_exit_on_failure_sending, wait_sending
 from fed.fed_object import FedObject
-from fed.utils import is_ray_object_refs, setup_logger
+from fed.utils import get_ray_options, is_ray_object_refs, setup_logger
 
 logger = logging.getLogger(__name__)
 
+# The process-local snapshot of the configs in the internal kv. They're
+# loaded on the first get in each process, and cleared by `init` and
+# `shutdown`.
+_config_snapshot = {}
+
 
 def init(
     address: str = None,
@@ -52,6 +65,17 @@ def init(
     cross_silo_send_max_retries: int = None,
     cross_silo_serializing_allowed_list: Dict = None,
     exit_on_failure_cross_silo_sending: bool = False,
+    cross_silo_grpc_chunk_size: int = None,
+    cross_silo_batching_policy: Dict = None,
+    cross_silo_compression: str = None,
+    cross_silo_compression_threshold: int = None,
+    cross_silo_serializing_policy: Dict = None,
+    cross_silo_eager_decoding_budget: int = None,
+    cross_silo_recv_memory_budget: int = None,
+    cross_silo_recv_spill_policy: Dict = None,
+    cross_silo_recv_entry_ttl_s: float = None,
+    cross_silo_content_dedup_policy: Dict = None,
+    cross_silo_sparsity_threshold: float = None,
     **kwargs,
 ):
     """
@@ -127,6 +151,100 @@ def init(
         exit_on_failure_cross_silo_sending: whether exit when failure on
             cross-silo sending. If True, a SIGTERM will be signaled to self
             if failed to sending cross-silo data.
+        cross_silo_grpc_chunk_size: optional; the data larger than this size
+            (in bytes) is sent in chunks of this size through a grpc stream,
+            32MB by default.
+        cross_silo_batching_policy: optional; a dict describes how the small
+            messages to the same party are coalesced into one rpc. If None,
+            the following default policy will be used, which disables the
+            batching. Batching saves rpcs when many small messages are sent
+            at once, at the cost of delaying every small message by up to
+            `window_us`.
+
+            .. code:: python
+                {
+                    # The max time to wait for more messages to the same
+                    # party before sending a batch, 0 means no batching,
+                    # e.g. 1000 for 1ms.
+                    "window_us": 0,
+                    # The max total size of a batch, the messages larger
+                    # than this are sent alone.
+                    "max_bytes": 1048576,
+                }
+        cross_silo_compression: optional; the codec to compress the data
+            sent to other parties, could be `none`, `gzip`, `lz4` or `zstd`.
+            `lz4` and `zstd` require the `lz4` and `zstandard` packages. The
+            codec is carried along with the data, so the receiver knows how
+            to decompress it. Not compressed if None.
+        cross_silo_compression_threshold: optional; the data smaller than
+            this size (in bytes) is not compressed, 4KB by default.
+        cross_silo_serializing_policy: optional; a dict describes where the
+            data sent to other parties is serialized and compressed, rather
+            than blocking the event loop of the send proxy. If None, the
+            following default policy will be used.
+
+            .. code:: python
+                {
+                    # Could be `thread`, `process` or `none`. The data is
+                    # pickled again to the worker process of `process`, so
+                    # it only pays off for the costly compression. `none`
+                    # means serializing in the event loop.
+                    "executor": "thread",
+                    # The max number of workers, None means the default of
+                    # the python executor.
+                    "max_workers": None,
+                }
+        cross_silo_eager_decoding_budget: optional; the received data is
+            decompressed in background as soon as it arrives, and this is
+            the max bytes of the decompressed data waiting for the consumers,
+            256MB by default. The data beyond that is decompressed by the
+            consumer, and 0 disables the eager decompression.
+        cross_silo_recv_memory_budget: optional; the max bytes of the
+            received data waiting for the consumers. The data beyond that is
+            rejected with `RESOURCE_EXHAUSTED`, and the sender sends it again
+            with backoff. Not limited if None.
+        cross_silo_recv_spill_policy: optional; a dict describes how the
+            received data not consumed yet is spilled to local files, and
+            it's read back through `mmap` once consumed. If None, the
+            following default policy will be used, which never spills.
+
+            .. code:: python
+                {
+                    # Spill the data arrives when the bytes of the data
+                    # waiting for the consumers in memory exceed this.
+                    "watermark_bytes": None,
+                    # The directory to write the spilled data, None means
+                    # the default temporary directory.
+                    "spill_dir": None,
+                }
+        cross_silo_recv_entry_ttl_s: optional; the received data not consumed
+            in this many seconds is evicted, and the consumer waiting for
+            the data not arriving in this many seconds gets a `TimeoutError`.
+            Never evicted if None.
+        cross_silo_content_dedup_policy: optional; a dict describes how the
+            identical data sent again is deduplicated. The sender remembers
+            the hashes of the data sent to each party, and only sends the
+            hash if the same data is sent again, the receiver gets the data
+            from its cache by the hash. Disabled if None, otherwise it's
+            merged with the following default policy. It should be enabled
+            by all parties.
+
+            .. code:: python
+                {
+                    # The data smaller than this is not deduplicated.
+                    "min_bytes": 65536,
+                    # The number of hashes the sender remembers for each
+                    # party.
+                    "index_size": 1024,
+                    # The max bytes of the data the receiver caches.
+                    "cache_bytes": 268435456,
+                }
+        cross_silo_sparsity_threshold: optional; the numpy arrays sent to
+            other parties with more zeros than this ratio, e.g. 0.9, are
+            sent as the indices and values of the non-zero elements, and
+            rebuilt into dense arrays by the receiver. The arrays can also
+            be wrapped by `fed.SparseArray` to be sent in the sparse format
+            explicitly. Not detected if None.
         kwargs: the args for ray.init().
 
     Examples:
@@ -149,11 +267,13 @@ def init(
     gcs_address = ray._private.worker._global_node.gcs_address
     gcs_client = GcsClient(address=gcs_address, nums_reconnect_retry=10)
     internal_kv._initialize_internal_kv(gcs_client)
+    _config_snapshot.clear()
     internal_kv._internal_kv_put(RAYFED_CLUSTER_KEY, cloudpickle.dumps(cluster))
     internal_kv._internal_kv_put(RAYFED_PARTY_KEY, cloudpickle.dumps(party))
     internal_kv._internal_kv_put(RAYFED_TLS_CONFIG, cloudpickle.dumps(tls_config))
     internal_kv._internal_kv_put(RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST,
                                  cloudpickle.dumps(cross_silo_serializing_allowed_list))
+    reset_pickle_whitelist()
     # Set logger.
     # Note(NKcqx): This should be called after internal_kv has party value, i.e.
     # after `ray.init` and `internal_kv._internal_kv_put(RAYFED_PARTY_KEY, cloudpickle.dumps(party))`
@@ -171,6 +291,11 @@ def init(
         tls_config=tls_config,
         logging_level=logging_level,
         retry_policy=cross_silo_grpc_retry_policy,
+        eager_decoding_budget=cross_silo_eager_decoding_budget,
+        memory_budget=cross_silo_recv_memory_budget,
+        spill_policy=cross_silo_recv_spill_policy,
+        entry_ttl_s=cross_silo_recv_entry_ttl_s,
+        content_dedup_policy=cross_silo_content_dedup_policy,
     )
     start_send_proxy(
         cluster=cluster,
@@ -179,6 +304,13 @@ def init(
         logging_level=logging_level,
         retry_policy=cross_silo_grpc_retry_policy,
         max_retries=cross_silo_send_max_retries,
+        chunk_size=cross_silo_grpc_chunk_size,
+        batching_policy=cross_silo_batching_policy,
+        compression=cross_silo_compression,
+        compression_threshold=cross_silo_compression_threshold,
+        serializing_policy=cross_silo_serializing_policy,
+        content_dedup_policy=cross_silo_content_dedup_policy,
+        sparsity_threshold=cross_silo_sparsity_threshold,
     )
 
 
@@ -187,38 +319,54 @@ def shutdown():
     Shutdown a RayFed client.
     """
     wait_sending()
+    stop_send_proxy()
+    stop_recv_proxy(get_party())
     internal_kv._internal_kv_del(RAYFED_CLUSTER_KEY)
     internal_kv._internal_kv_del(RAYFED_PARTY_KEY)
     internal_kv._internal_kv_del(RAYFED_TLS_CONFIG)
     internal_kv._internal_kv_del(RAYFED_CROSS_SILO_SERIALIZING_ALLOWED_LIST)
     internal_kv._internal_kv_reset()
+    _config_snapshot.clear()
+    reset_pickle_whitelist()
     ray.shutdown()
     logger.info('Shutdowned ray.')
 
 
+def _get_config(key):
+    """Get the config from the snapshot, or load it from the internal kv."""
+    config = _config_snapshot.get(key)
+    if config is None:
+        serialized = internal_kv._internal_kv_get(key)
+        config = cloudpickle.loads(serialized)
+        _config_snapshot[key] = config
+    return config
+
+
 def get_cluster():
     """
     Get the RayFed cluster configration.
+
+    The returned dict is shared in this process, which should not be
+    modified.
     """
-    # TODO(qwang): These getter could be cached in local.
-    serialized = internal_kv._internal_kv_get(RAYFED_CLUSTER_KEY)
-    return cloudpickle.loads(serialized)
+    return _get_config(RAYFED_CLUSTER_KEY)
 
 
 def get_party():
     """
     Get the current party name.
     """
-    serialized = internal_kv._internal_kv_get(RAYFED_PARTY_KEY)
-    return cloudpickle.loads(serialized)
+    return _get_config(RAYFED_PARTY_KEY)
 
 
 def get_tls():
     """
     Get the tls configurations on this party.
+
+    The returned dict is shared in this process, which should not be
+    modified.
     """
-    serialized = internal_kv._internal_kv_get(RAYFED_TLS_CONFIG)
-    return cloudpickle.loads(serialized)
+    return _get_config(RAYFED_TLS_CONFIG)
 
 
 class FedRemoteFunction:
@@ -227,18 +375,40 @@ class FedRemoteFunction:
         self._func_body = func_or_class
         self._options = {}
         self._fed_call_holder = None
+        # The ray remote function is built only once, since building it
+        # exports the function again.
+        self._ray_remote_func = None
+        # The ray remote function with the current options.
+        self._ray_remote_func_with_options = None
 
     def party(self, party: str):
         self._node_party = party
         # assert self._fed_call_holder is None
         # TODO(qwang): This should be refined, to make sure we don't reuse the object twice.
         self._fed_call_holder = FedCallHolder(
-            self._node_party, self._execute_impl, self._options
+            self._node_party,
+            self._execute_impl,
+            self._options,
+            f"{self._func_body.__module__}.{self._func_body.__qualname__}",
         )
         return self
 
     def options(self, **options):
+        """Set the options of the ray task.
+
+        Besides the options of ray, the following options of rayfed apply
+        to the outputs of this function when they are sent to other parties:
+
+        - `delta_encoding=True`: send the deltas against the outputs of the
+          last call sent to the same party, which saves the traffic if the
+          outputs change slightly every call, e.g. the model trained every
+          round.
+        - `quantization`: quantize the float arrays in the outputs, one of
+          `fp16`, `bf16` and `int8`, which is lossy but cuts the traffic by
+          2-4x, e.g. for the gradients.
+        """
         self._options = options
+        self._ray_remote_func_with_options = None
         if self._fed_call_holder:
             self._fed_call_holder.options(**options)
         return self
@@ -249,10 +419,20 @@ class FedRemoteFunction:
         ), "A fed function should be specified within a party to execute."
         return self._fed_call_holder.internal_remote(*args, **kwargs)
 
+    def _get_ray_remote_func(self):
+        if self._ray_remote_func_with_options is None:
+            if self._ray_remote_func is None:
+                self._ray_remote_func = ray.remote(self._func_body)
+            ray_options = get_ray_options(self._options)
+            self._ray_remote_func_with_options = (
+                self._ray_remote_func.options(**ray_options)
+                if ray_options
+                else self._ray_remote_func
+            )
+        return self._ray_remote_func_with_options
+
     def _execute_impl(self, args, kwargs):
-        return (
-            ray.remote(self._func_body).options(**self._options).remote(*args, **kwargs)
-        )
+        return self._get_ray_remote_func().remote(*args, **kwargs)
 
 
 class FedRemoteClass:
@@ -338,24 +518,32 @@ def get(
             assert ray_object_ref is not None
             ray_refs.append(ray_object_ref)
 
-            for party_name in cluster:
-                if party_name == current_party:
-                    continue
-                else:
-                    send(
-                        party_name,
-                        ray_object_ref,
-                        fed_object.get_fed_task_id(),
-                        fake_fed_task_id,
-                        party_name,
-                    )
+            dest_parties = [
+                party_name
+                for party_name in cluster
+                if party_name != current_party
+                and not fed_object._was_sending_or_sent_to_party(party_name)
+            ]
+            for party_name in dest_parties:
+                fed_object._mark_is_sending_to_party(party_name)
+            if dest_parties:
+                broadcast(
+                    dest_parties,
+                    ray_object_ref,
+                    fed_object.get_fed_task_id(),
+                    fake_fed_task_id,
+                )
         else:
             # This is the code path that the fed_object is not in current party.
             # So we should insert a `recv_op` as a barrier to receive the real
-            # data from the location party of the fed_object.
-            recv_obj = recv(
-                current_party, fed_object.get_fed_task_id(), fake_fed_task_id
-            )
+            # data from the location party of the fed_object, unless it has
+            # been received before.
+            recv_obj = fed_object.get_ray_object_ref()
+            if recv_obj is None:
+                recv_obj = recv(
+                    current_party, fed_object.get_fed_task_id(), fake_fed_task_id
+                )
+                fed_object._cache_ray_object_ref(recv_obj)
             ray_refs.append(recv_obj)
 
     values = ray.get(ray_refs)
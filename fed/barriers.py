@@ -13,53 +13,76 @@
 # limitations under the License.
 
 import asyncio
+import atexit
+import collections
+import functools
 import logging
-import threading
+import time
 from typing import Dict
 
-import cloudpickle
 import grpc
 import ray
 
+import fed._private.compression as fed_compression
+import fed._private.content_dedup as fed_content_dedup
+import fed._private.delta_encoding as fed_delta_encoding
+import fed._private.quantization as fed_quantization
+import fed._private.serialization_utils as fed_ser_utils
+import fed._private.serializing_executor as fed_serializing_executor
+import fed._private.sparse as fed_sparse
+import fed.grpc as fed_grpc
 import fed.utils as fed_utils
-from fed._private.grpc_options import get_grpc_options
+from fed._private.eager_decoder import EagerDecoder
+from fed._private.event_loop_monitor import EventLoopMonitor
+from fed._private.grpc_channel_pool import GrpcChannelPool
+from fed._private.grpc_credentials import (
+    ClientCredentialsCache,
+    ServerCredentialsLoader,
+    load_channel_credentials,
+)
+from fed._private.grpc_options import (
+    get_grpc_batching_policy,
+    get_grpc_chunk_size,
+    get_grpc_options,
+)
+from fed._private.rendezvous import RendezvousTable, rendezvous_key
+from fed._private.spill import SpilledData, SpillStore, get_spill_policy
 from fed.cleanup import push_to_sending
-from fed.grpc import fed_pb2, fed_pb2_grpc
 
 logger = logging.getLogger(__name__)
 
+# The backoff of resending the data rejected by a receiver out of memory.
+_BACKPRESSURE_INITIAL_BACKOFF_S = 0.1
+_BACKPRESSURE_MAX_BACKOFF_S = 5
+# Give up resending the rejected data after this many seconds.
+_BACKPRESSURE_TIMEOUT_S = 600
 
-def key_exists_in_two_dim_dict(the_dict, key_a, key_b) -> bool:
-    key_a, key_b = str(key_a), str(key_b)
-    if key_a not in the_dict:
-        return False
-    return key_b in the_dict[key_a]
 
+class SendDataService:
+    """The servicer of `GrpcService` defined in `fed/grpc/fed.proto`."""
 
-def add_two_dim_dict(the_dict, key_a, key_b, val):
-    key_a, key_b = str(key_a), str(key_b)
-    if key_a in the_dict:
-        the_dict[key_a].update({key_b: val})
-    else:
-        the_dict.update({key_a: {key_b: val}})
-
-
-def get_from_two_dim_dict(the_dict, key_a, key_b):
-    key_a, key_b = str(key_a), str(key_b)
-    return the_dict[key_a][key_b]
-
-
-def pop_from_two_dim_dict(the_dict, key_a, key_b):
-    key_a, key_b = str(key_a), str(key_b)
-    return the_dict[key_a].pop(key_b)
-
-
-class SendDataService(fed_pb2_grpc.GrpcServiceServicer):
-    def __init__(self, all_events, all_data, party, lock):
-        self._events = all_events
-        self._all_data = all_data
+    def __init__(
+        self,
+        rendezvous_table,
+        party,
+        decoder=None,
+        memory_budget=None,
+        spill_store=None,
+        content_cache=None,
+    ):
+        self._rendezvous_table = rendezvous_table
         self._party = party
-        self._lock = lock
+        self._decoder = decoder
+        self._memory_budget = memory_budget
+        self._spill_store = spill_store
+        self._content_cache = content_cache
+        # The bytes of the data streams being received.
+        self.receiving_bytes = 0
+        self.rejected_messages = 0
+        self.content_cache_hits = 0
+        self.content_cache_misses = 0
+        self.delta_bases = fed_delta_encoding.DeltaBases()
+        self.delta_base_misses = 0
 
     async def SendData(self, request, context):
         upstream_seq_id = request.upstream_seq_id
@@ -67,41 +90,229 @@ class SendDataService(fed_pb2_grpc.GrpcServiceServicer):
         logger.debug(
             f"[{self._party}] Received a grpc data request from {upstream_seq_id} to {downstream_seq_id}."
         )
+        await self._check_codec(request.codec, context)
+        data, codec = await self._resolve_content(
+            request.data, request.codec, request.content_hash, context
+        )
+        data, codec = await self._resolve_delta(data, codec, request, context)
+        await self._check_memory_budget(len(data), context)
+        self._keep_delta_base(request, data)
+        await self._put_data(upstream_seq_id, downstream_seq_id, data, codec)
+        return fed_grpc.fed_pb2.SendDataResponse(result="OK")
+
+    async def SendDataStream(self, request_iterator, context):
+        data = None
+        offset = 0
+        reserved = 0
+        try:
+            async for request in request_iterator:
+                if data is None:
+                    first_request = request
+                    upstream_seq_id = request.upstream_seq_id
+                    downstream_seq_id = request.downstream_seq_id
+                    codec = request.codec
+                    content_hash = request.content_hash
+                    await self._check_codec(codec, context)
+                    await self._check_memory_budget(request.total_size, context)
+                    # Assemble the chunks in place, rather than joining them
+                    # at the end which needs another full copy of the data.
+                    data = bytearray(request.total_size)
+                    reserved = len(data)
+                    self.receiving_bytes += reserved
+                if offset + len(request.data) > len(data):
+                    await context.abort(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        f"The data stream is larger than {len(data)} bytes.",
+                    )
+                data[offset : offset + len(request.data)] = request.data
+                offset += len(request.data)
+        finally:
+            self.receiving_bytes -= reserved
+        if data is None:
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT, "The data stream is empty."
+            )
+        if offset != len(data):
+            await context.abort(
+                grpc.StatusCode.INVALID_ARGUMENT,
+                f"The data stream ends at {offset} of {len(data)} bytes.",
+            )
+        logger.debug(
+            f"[{self._party}] Received a grpc data stream from {upstream_seq_id} "
+            f"to {downstream_seq_id}, {offset} bytes."
+        )
+        await self._resolve_content(data, codec, content_hash, context)
+        data, codec = await self._resolve_delta(data, codec, first_request, context)
+        self._keep_delta_base(first_request, data)
+        await self._put_data(upstream_seq_id, downstream_seq_id, data, codec)
+        return fed_grpc.fed_pb2.SendDataResponse(result="OK")
+
+    async def SendDataBatch(self, request, context):
+        logger.debug(
+            f"[{self._party}] Received a grpc data batch of {len(request.requests)} requests."
+        )
+        contents = []
+        for sub_request in request.requests:
+            await self._check_codec(sub_request.codec, context)
+            data, codec = await self._resolve_content(
+                sub_request.data,
+                sub_request.codec,
+                sub_request.content_hash,
+                context,
+            )
+            contents.append(
+                await self._resolve_delta(data, codec, sub_request, context)
+            )
+        await self._check_memory_budget(
+            sum(len(data) for data, _ in contents), context
+        )
+        for sub_request, (data, codec) in zip(request.requests, contents):
+            self._keep_delta_base(sub_request, data)
+            await self._put_data(
+                sub_request.upstream_seq_id,
+                sub_request.downstream_seq_id,
+                data,
+                codec,
+            )
+        return fed_grpc.fed_pb2.SendDataResponse(result="OK")
+
+    async def _check_codec(self, codec, context):
+        try:
+            fed_compression.check_codec(codec)
+        except (ValueError, ImportError) as e:
+            await context.abort(grpc.StatusCode.UNIMPLEMENTED, str(e))
+
+    async def _resolve_content(self, data, codec, content_hash, context):
+        """Cache the data by its hash, or get it from the cache if empty.
+
+        The cache is shared by all parties, so the hash is verified before
+        the data is cached, otherwise a party could cache forged data under
+        the hash of the data of another party.
 
-        with self._lock:
-            add_two_dim_dict(
-                self._all_data, upstream_seq_id, downstream_seq_id, request.data
+        Returns:
+            A tuple of the data and the codec.
+        """
+        if not content_hash:
+            return data, codec
+        key = (content_hash, codec)
+        if data:
+            if self._content_cache is not None:
+                actual_hash = await asyncio.get_event_loop().run_in_executor(
+                    None, fed_content_dedup.hash_frames, [data]
+                )
+                if actual_hash != content_hash:
+                    await context.abort(
+                        grpc.StatusCode.INVALID_ARGUMENT,
+                        f"The hash of the data is {actual_hash}, not "
+                        f"{content_hash}.",
+                    )
+                self._content_cache.put(key, (data, codec), len(data))
+            return data, codec
+        # Only the hash is sent, which is not cached if the dedup is disabled
+        # in this party.
+        cached = None
+        if self._content_cache is not None:
+            cached = self._content_cache.get(key)
+        if cached is None:
+            self.content_cache_misses += 1
+            # The sender will send the data again.
+            await context.abort(
+                grpc.StatusCode.NOT_FOUND,
+                f"The data {content_hash} is not cached in {self._party}.",
             )
-            if not key_exists_in_two_dim_dict(
-                self._events, upstream_seq_id, downstream_seq_id
-            ):
-                event = asyncio.Event()
-                add_two_dim_dict(
-                    self._events, upstream_seq_id, downstream_seq_id, event
+        self.content_cache_hits += 1
+        return cached
+
+    async def _resolve_delta(self, data, codec, request, context):
+        """Rebuild the data if it's a delta.
+
+        The data is kept as the next base by `_keep_delta_base` only after
+        it's accepted, otherwise the sender would retry a rejected delta
+        against a base the receiver has moved past.
+
+        Returns:
+            A tuple of the data and the codec.
+        """
+        if not request.delta_edge:
+            return data, codec
+        edge = request.delta_edge
+        if request.delta_base_version:
+            base = self.delta_bases.get(edge, request.delta_base_version)
+            if base is None:
+                self.delta_base_misses += 1
+                # The sender will send the full data again.
+                await context.abort(
+                    grpc.StatusCode.NOT_FOUND,
+                    f"The base version {request.delta_base_version} of {edge} "
+                    f"is not kept in {self._party}.",
                 )
-        event = get_from_two_dim_dict(self._events, upstream_seq_id, downstream_seq_id)
-        event.set()
-        logger.debug(f"[{self._party}] Event set for {upstream_seq_id}")
-        return fed_pb2.SendDataResponse(result="OK")
+            data = await asyncio.get_event_loop().run_in_executor(
+                None, fed_delta_encoding.decode, data, base, codec
+            )
+        else:
+            data = await asyncio.get_event_loop().run_in_executor(
+                None, fed_compression.decompress, data, codec
+            )
+        return data, fed_compression.NONE
+
+    def _keep_delta_base(self, request, data):
+        if request.delta_edge:
+            self.delta_bases.update(request.delta_edge, request.delta_version, data)
+
+    async def _check_memory_budget(self, size, context):
+        if not self._memory_budget:
+            return
+        used = self._rendezvous_table.queued_bytes + self.receiving_bytes
+        # A data larger than the budget is accepted if nothing is queued,
+        # otherwise it can never be received.
+        if used > 0 and used + size > self._memory_budget:
+            self.rejected_messages += 1
+            # The sender will send it again later.
+            await context.abort(
+                grpc.StatusCode.RESOURCE_EXHAUSTED,
+                f"The receiver {self._party} is out of memory budget, "
+                f"{used} bytes are queued.",
+            )
+
+    async def _put_data(self, upstream_seq_id, downstream_seq_id, data, codec):
+        size = len(data)
+        if self._spill_store is not None and self._spill_store.should_spill(
+            self._rendezvous_table.queued_bytes, size
+        ):
+            # It's kept encoded on disk, and not counted into the memory.
+            data = await self._spill_store.spill(data)
+            size = 0
+        elif self._decoder is not None:
+            data, codec = self._decoder.submit(data, codec)
+        key = rendezvous_key(upstream_seq_id, downstream_seq_id)
+        if not self._rendezvous_table.put(key, (data, codec), size):
+            logger.debug(f"[{self._party}] Dropped the duplicate data of {key}.")
+            if isinstance(data, SpilledData):
+                self._spill_store.remove(data)
+            elif self._decoder is not None:
+                self._decoder.discard(data)
+            return
+        logger.debug(f"[{self._party}] Data put for {upstream_seq_id}")
 
 
 async def _run_grpc_server(
-    port, event, all_data, party, lock, tls_config=None, grpc_options=None
+    port,
+    rendezvous_table,
+    party,
+    credentials_loader=None,
+    grpc_options=None,
+    service=None,
 ):
     server = grpc.aio.server(options=grpc_options)
-    fed_pb2_grpc.add_GrpcServiceServicer_to_server(
-        SendDataService(event, all_data, party, lock), server
-    )
+    if service is None:
+        service = SendDataService(rendezvous_table, party)
+    fed_grpc.fed_pb2_grpc.add_GrpcServiceServicer_to_server(service, server)
 
-    tls_enabled = fed_utils.tls_enabled(tls_config)
+    tls_enabled = credentials_loader is not None
     if tls_enabled:
-        ca_cert, private_key, cert_chain = fed_utils.load_server_certs(tls_config)
-        server_credentials = grpc.ssl_server_credentials(
-            [(private_key, cert_chain)],
-            root_certificates=ca_cert,
-            require_client_auth=ca_cert is not None,
+        server.add_secure_port(
+            f'[::]:{port}', credentials_loader.server_credentials()
         )
-        server.add_secure_port(f'[::]:{port}', server_credentials)
     else:
         server.add_insecure_port(f'[::]:{port}')
 
@@ -112,64 +323,147 @@ async def _run_grpc_server(
     await server.wait_for_termination()
 
 
+def _serialize_data(
+    data, codec, threshold, quantization=None, sparsity_threshold=None
+):
+    """Serialize the data into frames, and compress them if needed.
+
+    Returns:
+        A tuple of the codec actually used and the list of frames.
+    """
+    frames = fed_ser_utils.dumps_frames(data, quantization, sparsity_threshold)
+    if not codec or codec == fed_compression.NONE:
+        return fed_compression.NONE, frames
+    codec, data = fed_compression.compress(b"".join(frames), codec, threshold)
+    return codec, [data]
+
+
+def _serialize_data_in_process(
+    data, codec, threshold, quantization=None, sparsity_threshold=None
+):
+    # The frames referring to the memory of this process can't be returned
+    # to the actor process, so join them into one.
+    codec, frames = _serialize_data(
+        data, codec, threshold, quantization, sparsity_threshold
+    )
+    return codec, [b"".join(frames)]
+
+
+def _frames_size(frames):
+    return sum(memoryview(frame).nbytes for frame in frames)
+
+
+def _chunk_requests(
+    frames,
+    upstream_seq_id,
+    downstream_seq_id,
+    chunk_size,
+    codec,
+    content_hash=None,
+    delta_fields=None,
+):
+    # The chunks are sliced from each frame directly, so the large buffers
+    # are copied only once into the requests rather than joined beforehand.
+    first = True
+    for frame in frames:
+        view = memoryview(frame).cast("B")
+        for offset in range(0, len(view), chunk_size):
+            chunk = bytes(view[offset : offset + chunk_size])
+            if first:
+                first = False
+                yield fed_grpc.fed_pb2.SendDataRequest(
+                    data=chunk,
+                    upstream_seq_id=str(upstream_seq_id),
+                    downstream_seq_id=str(downstream_seq_id),
+                    total_size=_frames_size(frames),
+                    codec=codec,
+                    content_hash=content_hash,
+                    **(delta_fields or {}),
+                )
+            else:
+                yield fed_grpc.fed_pb2.SendDataRequest(data=chunk)
+
+
 async def send_data_grpc(
-    dest,
-    data,
+    stub,
+    frames,
     upstream_seq_id,
     downstream_seq_id,
-    node_party=None,
-    tls_config=None,
-    retry_policy=None,
+    chunk_size,
+    codec=None,
+    content_hash=None,
+    delta_fields=None,
 ):
-    tls_enabled = fed_utils.tls_enabled(tls_config)
-    grpc_options = get_grpc_options(retry_policy=retry_policy)
-    if tls_enabled:
-        ca_cert, private_key, cert_chain = fed_utils.load_client_certs(
-            tls_config, target_party=node_party
+    """Send the serialized data to the stub.
+
+    Args:
+        frames: the list of bytes-like objects which concatenated is the
+            serialized data.
+        content_hash: optional; the hash of the data for the receiver to
+            cache it.
+        delta_fields: optional; the `delta_*` fields of the request if the
+            data is delta encoded.
+    """
+    if _frames_size(frames) > chunk_size:
+        # Stream the large data in chunks, to avoid exceeding the max message
+        # size and holding another full copy of the data in grpc.
+        response = await stub.SendDataStream(
+            _chunk_requests(
+                frames,
+                upstream_seq_id,
+                downstream_seq_id,
+                chunk_size,
+                codec,
+                content_hash,
+                delta_fields,
+            ),
+            timeout=60,
         )
-        credentials = grpc.ssl_channel_credentials(
-            certificate_chain=cert_chain,
-            private_key=private_key,
-            root_certificates=ca_cert,
+    else:
+        request = fed_grpc.fed_pb2.SendDataRequest(
+            data=b"".join(frames),
+            upstream_seq_id=str(upstream_seq_id),
+            downstream_seq_id=str(downstream_seq_id),
+            codec=codec,
+            content_hash=content_hash,
+            **(delta_fields or {}),
         )
+        # wait for downstream's reply
+        response = await stub.SendData(request, timeout=60)
+    logger.debug(
+        f"Received data response from seq_id {downstream_seq_id} result: {response.result}."
+    )
+    return response.result
 
-        async with grpc.aio.secure_channel(
-            dest,
-            credentials,
-            options=grpc_options
-            + [
-                # ('grpc.ssl_target_name_override', "rayfed"),
-                # ("grpc.default_authority", "rayfed"),
-            ],
-        ) as channel:
-            stub = fed_pb2_grpc.GrpcServiceStub(channel)
-            data = cloudpickle.dumps(data)
-            request = fed_pb2.SendDataRequest(
-                data=data,
-                upstream_seq_id=str(upstream_seq_id),
-                downstream_seq_id=str(downstream_seq_id),
-            )
-            # wait for downstream's reply
-            response = await stub.SendData(request, timeout=60)
-            logger.debug(
-                f"Received data response from seq_id {downstream_seq_id} result: {response.result}."
-            )
-            return response.result
-    else:
-        async with grpc.aio.insecure_channel(dest, options=grpc_options) as channel:
-            stub = fed_pb2_grpc.GrpcServiceStub(channel)
-            data = cloudpickle.dumps(data)
-            request = fed_pb2.SendDataRequest(
-                data=data,
-                upstream_seq_id=str(upstream_seq_id),
-                downstream_seq_id=str(downstream_seq_id),
-            )
-            # wait for downstream's reply
-            response = await stub.SendData(request, timeout=60)
-            logger.debug(
-                f"Received data response from seq_id {downstream_seq_id} result: {response.result}."
-            )
-            return response.result
+
+def _raise_picklable_rpc_error(method):
+    """Raise the grpc errors of the actor method as `RuntimeError`.
+
+    A `grpc.aio.AioRpcError` can't be pickled, which kills the actor when
+    it's returned to the caller.
+    """
+
+    @functools.wraps(method)
+    async def _wrapper(self, *args, **kwargs):
+        try:
+            return await method(self, *args, **kwargs)
+        except grpc.aio.AioRpcError as e:
+            raise RuntimeError(
+                f"Failed to send the data, {e.code()}: {e.details()}"
+            ) from None
+
+    return _wrapper
+
+
+class _PendingBatch:
+    """The small messages to the same party waiting to be sent together."""
+
+    def __init__(self, dest_addr, credentials_fn) -> None:
+        self.dest_addr = dest_addr
+        self.credentials_fn = credentials_fn
+        self.requests = []
+        self.futures = []
+        self.size = 0
 
 
 @ray.remote
@@ -181,6 +475,13 @@ class SendProxyActor:
         tls_config: Dict = None,
         logging_level: str = None,
         retry_policy: Dict = None,
+        chunk_size: int = None,
+        batching_policy: Dict = None,
+        compression: str = None,
+        compression_threshold: int = None,
+        serializing_policy: Dict = None,
+        content_dedup_policy: Dict = None,
+        sparsity_threshold: float = None,
     ):
         self._cluster = cluster
         self._party = party
@@ -188,10 +489,58 @@ class SendProxyActor:
         if logging_level:
             logger.setLevel(logging_level.upper())
         self.retry_policy = retry_policy
+        self._chunk_size = get_grpc_chunk_size(chunk_size)
+        fed_compression.check_codec(compression)
+        self._compression = compression
+        self._compression_threshold = fed_compression.get_compression_threshold(
+            compression_threshold
+        )
+        fed_sparse.check_sparsity_threshold(sparsity_threshold)
+        self._sparsity_threshold = sparsity_threshold
+        self._channel_pool = GrpcChannelPool(
+            grpc_options=get_grpc_options(retry_policy=retry_policy)
+        )
+        self._credentials_cache = ClientCredentialsCache(tls_config)
+        batching_policy = get_grpc_batching_policy(batching_policy)
+        self._batching_window_s = batching_policy["window_us"] / 1e6
+        self._batching_max_bytes = batching_policy["max_bytes"]
+        # Map from the channel key to the `_PendingBatch` being coalesced.
+        self._pending_batches = {}
+        self._sending_batch_tasks = set()
+        self._sent_batches = 0
+        self._batched_messages = 0
+        serializing_policy = fed_serializing_executor.get_serializing_policy(
+            serializing_policy
+        )
+        self._serializing_executor = fed_serializing_executor.create_executor(
+            serializing_policy
+        )
+        self._serialize_func = (
+            _serialize_data_in_process
+            if serializing_policy["executor"] == fed_serializing_executor.PROCESS
+            else _serialize_data
+        )
+        self._loop_monitor = EventLoopMonitor()
+        self._serializing_s = 0.0
+        self._serialized_bytes = 0
+        self._backpressure_retries = 0
+        self._content_dedup_policy = fed_content_dedup.get_content_dedup_policy(
+            content_dedup_policy
+        )
+        self._sent_content_index = None
+        if self._content_dedup_policy is not None:
+            self._sent_content_index = fed_content_dedup.SentContentIndex(
+                self._content_dedup_policy["index_size"]
+            )
+        self._deduplicated_bytes = 0
+        self._delta_bases = fed_delta_encoding.DeltaBases()
+        self._delta_locks = collections.defaultdict(asyncio.Lock)
+        self._delta_saved_bytes = 0
 
     async def is_ready(self):
         return True
 
+    @_raise_picklable_rpc_error
     async def send(
         self,
         dest_party,
@@ -200,6 +549,9 @@ class SendProxyActor:
         downstream_seq_id,
         node_party=None,
         tls_config=None,
+        compression=None,
+        delta_edge=None,
+        quantization=None,
     ):
         assert (
             dest_party in self._cluster
@@ -207,19 +559,388 @@ class SendProxyActor:
         logger.debug(
             f"[{self._party}] Sending data to seq_id {downstream_seq_id} from {upstream_seq_id}"
         )
-        dest_addr = self._cluster[dest_party]['address']
-        response = await send_data_grpc(
-            dest=dest_addr,
-            data=data,
-            upstream_seq_id=upstream_seq_id,
-            downstream_seq_id=downstream_seq_id,
-            tls_config=tls_config if tls_config else self._tls_config,
-            node_party=node_party,
-            retry_policy=self.retry_policy,
+        if delta_edge is not None:
+            await self._send_delta(
+                dest_party,
+                data,
+                upstream_seq_id,
+                downstream_seq_id,
+                node_party,
+                tls_config,
+                compression or self._compression,
+                delta_edge,
+                quantization,
+            )
+            return True
+        codec, frames, content_hash = await self._serialize(
+            data, compression or self._compression, quantization=quantization
+        )
+        await self._send_serialized(
+            dest_party,
+            codec,
+            frames,
+            upstream_seq_id,
+            downstream_seq_id,
+            node_party,
+            tls_config,
+            content_hash,
         )
-        logger.debug(f"Sent. Response is {response}")
         return True  # True indicates it's sent successfully.
 
+    @_raise_picklable_rpc_error
+    async def broadcast(
+        self,
+        dest_parties,
+        data,
+        upstream_seq_id,
+        downstream_seq_id,
+        compression=None,
+    ):
+        """Send the same data to all of `dest_parties` concurrently.
+
+        The data is serialized only once for all parties.
+        """
+        for dest_party in dest_parties:
+            assert (
+                dest_party in self._cluster
+            ), f'Failed to find {dest_party} in cluster {self._cluster}.'
+        logger.debug(
+            f"[{self._party}] Broadcasting data to {dest_parties} from {upstream_seq_id}"
+        )
+        codec, frames, content_hash = await self._serialize(
+            data, compression or self._compression
+        )
+        await asyncio.gather(
+            *[
+                self._send_serialized(
+                    dest_party,
+                    codec,
+                    frames,
+                    upstream_seq_id,
+                    downstream_seq_id,
+                    node_party=dest_party,
+                    content_hash=content_hash,
+                )
+                for dest_party in dest_parties
+            ]
+        )
+        return True
+
+    async def _send_delta(
+        self,
+        dest_party,
+        data,
+        upstream_seq_id,
+        downstream_seq_id,
+        node_party,
+        tls_config,
+        codec,
+        delta_edge,
+        quantization=None,
+    ):
+        """Send the delta of the data against the last one along the edge."""
+        # The data along the edge is sent one by one, so the receiver gets
+        # the base before the delta of it.
+        async with self._delta_locks[(dest_party, delta_edge)]:
+            _, frames, _ = await self._serialize(
+                data,
+                fed_compression.NONE,
+                content_dedup=False,
+                quantization=quantization,
+            )
+            data = b"".join(frames)
+            # The same edge name of different parties are different edges.
+            edge = f"{self._party}:{delta_edge}"
+            version, base_version, base = self._delta_bases.next_version(
+                (dest_party, edge), data
+            )
+            loop = asyncio.get_event_loop()
+            if base is not None and len(base) == len(data):
+                delta_codec, delta = await loop.run_in_executor(
+                    None, fed_delta_encoding.encode, data, base, codec
+                )
+                try:
+                    await self._send_serialized(
+                        dest_party,
+                        delta_codec,
+                        [delta],
+                        upstream_seq_id,
+                        downstream_seq_id,
+                        node_party,
+                        tls_config,
+                        delta_fields={
+                            "delta_edge": edge,
+                            "delta_version": version,
+                            "delta_base_version": base_version,
+                        },
+                    )
+                    self._delta_saved_bytes += len(data) - len(delta)
+                    return
+                except grpc.aio.AioRpcError as e:
+                    if e.code() != grpc.StatusCode.NOT_FOUND:
+                        raise
+                    logger.debug(f"[{self._party}] {e.details()} Send the full data.")
+            codec, data = await loop.run_in_executor(
+                None, fed_compression.compress, data, codec, self._compression_threshold
+            )
+            await self._send_serialized(
+                dest_party,
+                codec,
+                [data],
+                upstream_seq_id,
+                downstream_seq_id,
+                node_party,
+                tls_config,
+                delta_fields={"delta_edge": edge, "delta_version": version},
+            )
+
+    async def _send_serialized(
+        self,
+        dest_party,
+        codec,
+        frames,
+        upstream_seq_id,
+        downstream_seq_id,
+        node_party=None,
+        tls_config=None,
+        content_hash=None,
+        delta_fields=None,
+    ):
+        dest_addr = self._cluster[dest_party]['address']
+        if tls_config and tls_config != self._tls_config:
+            # The certs specified for this message only are not cached.
+            client_cert_config = tls_config["client_certs"][node_party]
+            channel_key = (dest_addr, tuple(sorted(client_cert_config.items())))
+            credentials_fn = functools.partial(
+                load_channel_credentials, tls_config, node_party
+            )
+        elif fed_utils.tls_enabled(self._tls_config):
+            channel_key = (dest_addr, node_party)
+            credentials_fn = functools.partial(
+                self._credentials_cache.get, node_party
+            )
+        else:
+            channel_key = (dest_addr, None)
+            credentials_fn = None
+
+        if content_hash is not None and self._sent_content_index.contains(
+            dest_party, content_hash
+        ):
+            # Only send the hash since the receiver has the same data.
+            request = fed_grpc.fed_pb2.SendDataRequest(
+                upstream_seq_id=str(upstream_seq_id),
+                downstream_seq_id=str(downstream_seq_id),
+                codec=codec,
+                content_hash=content_hash,
+            )
+
+            async def _send_content_hash():
+                async with self._channel_pool.acquire(
+                    channel_key, dest_addr, credentials_fn
+                ) as stub:
+                    return await stub.SendData(request, timeout=60)
+
+            try:
+                await self._retry_on_backpressure(_send_content_hash)
+                self._deduplicated_bytes += _frames_size(frames)
+                return
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.NOT_FOUND:
+                    raise
+                logger.debug(f"[{self._party}] {e.details()} Send it again.")
+                self._sent_content_index.discard(dest_party, content_hash)
+
+        size = _frames_size(frames)
+        # The deltas may be rejected by the receiver, which fails the whole
+        # batch, so they are sent alone.
+        if (
+            self._batching_window_s > 0
+            and size < self._batching_max_bytes
+            and delta_fields is None
+        ):
+            request = fed_grpc.fed_pb2.SendDataRequest(
+                data=b"".join(frames),
+                upstream_seq_id=str(upstream_seq_id),
+                downstream_seq_id=str(downstream_seq_id),
+                codec=codec,
+                content_hash=content_hash,
+            )
+            response = await self._send_in_batch(
+                channel_key, dest_addr, credentials_fn, request
+            )
+        else:
+
+            async def _send():
+                async with self._channel_pool.acquire(
+                    channel_key, dest_addr, credentials_fn
+                ) as stub:
+                    return await send_data_grpc(
+                        stub=stub,
+                        frames=frames,
+                        upstream_seq_id=upstream_seq_id,
+                        downstream_seq_id=downstream_seq_id,
+                        chunk_size=self._chunk_size,
+                        codec=codec,
+                        content_hash=content_hash,
+                        delta_fields=delta_fields,
+                    )
+
+            response = await self._retry_on_backpressure(_send)
+        if content_hash is not None:
+            self._sent_content_index.add(dest_party, content_hash)
+        logger.debug(f"Sent. Response is {response}")
+
+    async def _retry_on_backpressure(self, send_fn):
+        """Call `send_fn` again with backoff if the receiver rejects it."""
+        backoff_s = _BACKPRESSURE_INITIAL_BACKOFF_S
+        deadline = time.monotonic() + _BACKPRESSURE_TIMEOUT_S
+        while True:
+            try:
+                return await send_fn()
+            except grpc.aio.AioRpcError as e:
+                if (
+                    e.code() != grpc.StatusCode.RESOURCE_EXHAUSTED
+                    or time.monotonic() + backoff_s > deadline
+                ):
+                    raise
+                logger.debug(f"[{self._party}] {e.details()} Retry later.")
+            self._backpressure_retries += 1
+            await asyncio.sleep(backoff_s)
+            backoff_s = min(backoff_s * 2, _BACKPRESSURE_MAX_BACKOFF_S)
+
+    async def _serialize(self, data, codec, content_dedup=True, quantization=None):
+        self._loop_monitor.start()
+        start = time.monotonic()
+        if self._serializing_executor is None:
+            codec, frames = self._serialize_func(
+                data,
+                codec,
+                self._compression_threshold,
+                quantization,
+                self._sparsity_threshold,
+            )
+        else:
+            codec, frames = await asyncio.get_event_loop().run_in_executor(
+                self._serializing_executor,
+                self._serialize_func,
+                data,
+                codec,
+                self._compression_threshold,
+                quantization,
+                self._sparsity_threshold,
+            )
+        size = _frames_size(frames)
+        content_hash = None
+        if (
+            content_dedup
+            and self._content_dedup_policy is not None
+            and size >= self._content_dedup_policy["min_bytes"]
+        ):
+            content_hash = await asyncio.get_event_loop().run_in_executor(
+                None, fed_content_dedup.hash_frames, frames
+            )
+        self._serializing_s += time.monotonic() - start
+        self._serialized_bytes += size
+        return codec, frames, content_hash
+
+    async def get_stats(self):
+        """Get the stats of this proxy, e.g. how long the loop is blocked."""
+        stats = self._loop_monitor.get_stats()
+        stats["serializing_s"] = self._serializing_s
+        stats["serialized_bytes"] = self._serialized_bytes
+        stats["backpressure_retries"] = self._backpressure_retries
+        stats["deduplicated_bytes"] = self._deduplicated_bytes
+        stats["delta_saved_bytes"] = self._delta_saved_bytes
+        stats["sent_batches"] = self._sent_batches
+        stats["batched_messages"] = self._batched_messages
+        stats["created_channels"] = self._channel_pool.created_channels
+        return stats
+
+    async def _send_in_batch(self, channel_key, dest_addr, credentials_fn, request):
+        """Send the request together with the others to the same party.
+
+        The batch is sent once it's full, or after the batching window since
+        its first request, so the request is delayed by up to the window.
+        If the batch fails, all of its requests fail with the same error.
+        """
+        batch = self._pending_batches.get(channel_key)
+        if batch is None:
+            batch = _PendingBatch(dest_addr, credentials_fn)
+            self._pending_batches[channel_key] = batch
+            asyncio.get_event_loop().call_later(
+                self._batching_window_s, self._flush_batch, channel_key, batch
+            )
+        future = asyncio.get_event_loop().create_future()
+        batch.requests.append(request)
+        batch.futures.append(future)
+        batch.size += len(request.data)
+        if batch.size >= self._batching_max_bytes:
+            self._flush_batch(channel_key, batch)
+        return await future
+
+    def _flush_batch(self, channel_key, batch):
+        if self._pending_batches.get(channel_key) is not batch:
+            # It has been flushed since it's full.
+            return
+        self._pending_batches.pop(channel_key)
+        task = asyncio.ensure_future(self._send_batch(channel_key, batch))
+        # Hold the task to avoid it being garbage collected before done.
+        self._sending_batch_tasks.add(task)
+        task.add_done_callback(self._sending_batch_tasks.discard)
+
+    async def _send_batch(self, channel_key, batch):
+        if len(batch.requests) > 1:
+            self._sent_batches += 1
+            self._batched_messages += len(batch.requests)
+
+        async def _send():
+            async with self._channel_pool.acquire(
+                channel_key, batch.dest_addr, batch.credentials_fn
+            ) as stub:
+                if len(batch.requests) == 1:
+                    return await stub.SendData(batch.requests[0], timeout=60)
+                logger.debug(
+                    f"[{self._party}] Sending a batch of {len(batch.requests)} requests."
+                )
+                return await stub.SendDataBatch(
+                    fed_grpc.fed_pb2.SendDataBatchRequest(requests=batch.requests),
+                    timeout=60,
+                )
+
+        try:
+            response = await self._retry_on_backpressure(_send)
+        except Exception as e:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for future in batch.futures:
+                if not future.done():
+                    future.set_result(response.result)
+
+    async def close(self):
+        """Close the grpc channels before the actor is killed."""
+        await self._channel_pool.close()
+        return True
+
+    async def reload_tls_credentials(self):
+        self._credentials_cache.reload()
+        # The established channels still use the old certs, make the
+        # following messages go through new channels.
+        self._channel_pool.invalidate()
+        return True
+
+
+def _received_data_size(data):
+    if isinstance(data, SpilledData):
+        return data.size
+    if isinstance(data, asyncio.Future):
+        # It's being decoded, or the decoding is cancelled or failed.
+        if not data.done() or data.cancelled() or data.exception() is not None:
+            return 0
+        return len(data.result())
+    return len(data)
+
 
 @ray.remote
 class RecverProxyActor:
@@ -230,6 +951,11 @@ class RecverProxyActor:
         tls_config=None,
         logging_level: str = None,
         retry_policy: Dict = None,
+        eager_decoding_budget: int = None,
+        memory_budget: int = None,
+        spill_policy: Dict = None,
+        entry_ttl_s: float = None,
+        content_dedup_policy: Dict = None,
     ):
         self._listen_addr = listen_addr
         self._party = party
@@ -237,56 +963,175 @@ class RecverProxyActor:
         if logging_level:
             logger.setLevel(logging_level.upper())
         self.retry_policy = retry_policy
+        self._credentials_loader = (
+            ServerCredentialsLoader(tls_config)
+            if fed_utils.tls_enabled(tls_config)
+            else None
+        )
 
-        # Workaround the threading coordinations
-
-        # All events for grpc waitting usage.
-        self._events = {}  # map from (upstream_seq_id, downstream_seq_id) to event
-        self._all_data = {}  # map from (upstream_seq_id, downstream_seq_id) to data
-        self._lock = threading.Lock()
+        # Where the received data meets the `get_data` calls.
+        self._rendezvous_table = RendezvousTable()
+        self._decoder = EagerDecoder(eager_decoding_budget)
+        spill_policy = get_spill_policy(spill_policy)
+        self._spill_store = None
+        if spill_policy["watermark_bytes"] is not None:
+            self._spill_store = SpillStore(
+                spill_policy["watermark_bytes"], party, spill_policy["spill_dir"]
+            )
+            atexit.register(self._spill_store.close)
+        content_dedup_policy = fed_content_dedup.get_content_dedup_policy(
+            content_dedup_policy
+        )
+        self._content_cache = None
+        if content_dedup_policy is not None:
+            self._content_cache = fed_content_dedup.ContentCache(
+                content_dedup_policy["cache_bytes"]
+            )
+        self._service = SendDataService(
+            self._rendezvous_table,
+            party,
+            self._decoder,
+            memory_budget,
+            self._spill_store,
+            self._content_cache,
+        )
+        self._entry_ttl_s = entry_ttl_s
+        self._evicting_task = None
+        self._evicted_messages = 0
+        self._evicted_bytes = 0
+        self._timed_out_waiters = 0
 
     async def run_grpc_server(self):
+        if self._entry_ttl_s:
+            self._evicting_task = asyncio.ensure_future(
+                self._evict_stale_entries_periodically()
+            )
         return await _run_grpc_server(
             self._listen_addr[self._listen_addr.index(':') + 1 :],
-            self._events,
-            self._all_data,
+            self._rendezvous_table,
             self._party,
-            self._lock,
-            self._tls_config,
+            self._credentials_loader,
             get_grpc_options(self.retry_policy),
+            self._service,
         )
 
     async def is_ready(self):
         return True
 
+    async def reload_tls_credentials(self):
+        if self._credentials_loader is not None:
+            self._credentials_loader.reload()
+        return True
+
+    async def close(self):
+        """Remove the spilled files before the actor is killed.
+
+        The actor may be killed without running the `atexit` hooks.
+        """
+        if self._spill_store is not None:
+            self._spill_store.close()
+        return True
+
     async def get_data(self, upstream_seq_id, curr_seq_id):
         logger.debug(
             f"[{self._party}] Getting data for {curr_seq_id} from {upstream_seq_id}"
         )
-        with self._lock:
-            if not key_exists_in_two_dim_dict(
-                self._events, upstream_seq_id, curr_seq_id
-            ):
-                add_two_dim_dict(
-                    self._events, upstream_seq_id, curr_seq_id, asyncio.Event()
-                )
+        data, codec = await self._rendezvous_table.claim(
+            rendezvous_key(upstream_seq_id, curr_seq_id)
+        )
+        logger.debug(f"[{self._party}] Waited for {curr_seq_id}.")
+        if isinstance(data, SpilledData):
+            data = self._spill_store.load(data)
+        data = await self._decoder.result(data)
+        # The data is deserialized in the worker consuming it.
+        return fed_ser_utils.ReceivedData(data, codec)
 
-        curr_event = get_from_two_dim_dict(self._events, upstream_seq_id, curr_seq_id)
-        await curr_event.wait()
-        logging.debug(f"[{self._party}] Waited for {curr_seq_id}.")
-        with self._lock:
-            data = pop_from_two_dim_dict(self._all_data, upstream_seq_id, curr_seq_id)
-            pop_from_two_dim_dict(self._events, upstream_seq_id, curr_seq_id)
+    async def _evict_stale_entries_periodically(self):
+        while True:
+            await asyncio.sleep(min(self._entry_ttl_s / 2, 60))
+            self._evict_stale_entries()
 
-        # NOTE(qwang): This is used to avoid the conflict with pickle5 in Ray.
-        import fed._private.serialization_utils as fed_ser_utils
+    def _evict_stale_entries(self):
+        for key, age, value in self._rendezvous_table.stale_entries(
+            self._entry_ttl_s
+        ):
+            upstream_seq_id, downstream_seq_id = key
+            self._rendezvous_table.evict(
+                key,
+                TimeoutError(
+                    f"[{self._party}] The data from {upstream_seq_id} to "
+                    f"{downstream_seq_id} doesn't arrive in {age:.1f} seconds."
+                ),
+            )
+            if value is None:
+                self._timed_out_waiters += 1
+                continue
+            data, _ = value
+            logger.warning(
+                f"[{self._party}] Evicted the data from {upstream_seq_id} to "
+                f"{downstream_seq_id}, which is not consumed in {age:.1f} seconds."
+            )
+            self._evicted_messages += 1
+            self._evicted_bytes += _received_data_size(data)
+            if isinstance(data, SpilledData):
+                self._spill_store.remove(data)
+            else:
+                self._decoder.discard(data)
 
-        fed_ser_utils._apply_loads_function_with_whitelist()
-        return cloudpickle.loads(data)
+    async def list_stale_entries(self, older_than_s=None):
+        """List the received data not consumed and the consumers waiting.
+
+        Args:
+            older_than_s: optional; list the entries older than this many
+                seconds only, defaults to the ttl of the entries, or 0.
+        """
+        if older_than_s is None:
+            older_than_s = self._entry_ttl_s or 0
+        entries = []
+        for key, age, value in self._rendezvous_table.stale_entries(older_than_s):
+            entries.append(
+                {
+                    "upstream_seq_id": key[0],
+                    "downstream_seq_id": key[1],
+                    "age_s": age,
+                    "waiting": value is None,
+                    "size": 0 if value is None else _received_data_size(value[0]),
+                }
+            )
+        return entries
+
+    async def get_stats(self):
+        """Get the stats of this proxy, e.g. the bytes of the queued data."""
+        stats = self._decoder.get_stats()
+        stats["queued_bytes"] = self._rendezvous_table.queued_bytes
+        stats["queued_messages"] = len(self._rendezvous_table)
+        stats["rejected_messages"] = self._service.rejected_messages
+        stats["receiving_bytes"] = self._service.receiving_bytes
+        if self._spill_store is not None:
+            stats["spilled_bytes"] = self._spill_store.spilled_bytes
+        stats["evicted_messages"] = self._evicted_messages
+        stats["evicted_bytes"] = self._evicted_bytes
+        stats["timed_out_waiters"] = self._timed_out_waiters
+        if self._content_cache is not None:
+            stats["content_cached_bytes"] = self._content_cache.cached_bytes
+        stats["content_cache_hits"] = self._service.content_cache_hits
+        stats["content_cache_misses"] = self._service.content_cache_misses
+        stats["delta_base_bytes"] = self._service.delta_bases.nbytes
+        stats["delta_base_misses"] = self._service.delta_base_misses
+        return stats
 
 
 def start_recv_proxy(
-    cluster: str, party: str, tls_config=None, logging_level=None, retry_policy=None
+    cluster: str,
+    party: str,
+    tls_config=None,
+    logging_level=None,
+    retry_policy=None,
+    eager_decoding_budget=None,
+    memory_budget=None,
+    spill_policy=None,
+    entry_ttl_s=None,
+    content_dedup_policy=None,
 ):
     # Create RecevrProxyActor
     # Not that this is now a threaded actor.
@@ -303,6 +1148,11 @@ def start_recv_proxy(
         tls_config=tls_config,
         logging_level=logging_level,
         retry_policy=retry_policy,
+        eager_decoding_budget=eager_decoding_budget,
+        memory_budget=memory_budget,
+        spill_policy=spill_policy,
+        entry_ttl_s=entry_ttl_s,
+        content_dedup_policy=content_dedup_policy,
     )
     recver_proxy_actor.run_grpc_server.remote()
     assert ray.get(recver_proxy_actor.is_ready.remote())
@@ -319,6 +1169,13 @@ def start_send_proxy(
     logging_level=None,
     retry_policy=None,
     max_retries=None,
+    chunk_size=None,
+    batching_policy=None,
+    compression=None,
+    compression_threshold=None,
+    serializing_policy=None,
+    content_dedup_policy=None,
+    sparsity_threshold=None,
 ):
     # Create RecevrProxyActor
     global _SEND_PROXY_ACTOR
@@ -339,6 +1196,13 @@ def start_send_proxy(
         tls_config=tls_config,
         logging_level=logging_level,
         retry_policy=retry_policy,
+        chunk_size=chunk_size,
+        batching_policy=batching_policy,
+        compression=compression,
+        compression_threshold=compression_threshold,
+        serializing_policy=serializing_policy,
+        content_dedup_policy=content_dedup_policy,
+        sparsity_threshold=sparsity_threshold,
     )
     assert ray.get(_SEND_PROXY_ACTOR.is_ready.remote())
     logger.info("SendProxy was successfully created.")
@@ -351,7 +1215,23 @@ def send(
     downstream_seq_id,
     node_party=None,
     tls_config=None,
+    compression=None,
+    delta_edge=None,
+    quantization=None,
 ):
+    """Send the data to the party asynchronously.
+
+    Args:
+        compression: optional; the codec to compress this data with, the
+            `cross_silo_compression` of `fed.init` is used if None.
+        delta_edge: optional; the name of the edge to send the delta of the
+            data against the last one sent along it, see
+            `fed._private.delta_encoding`.
+        quantization: optional; the lossy quantization of the float arrays
+            in the data, one of `fp16`, `bf16` and `int8`. The receiver gets
+            the arrays dequantized back to their dtypes.
+    """
+    fed_quantization.check_quantization(quantization)
     send_proxy = ray.get_actor("SendProxyActor")
     res = send_proxy.send.remote(
         dest_party=dest_party,
@@ -360,12 +1240,73 @@ def send(
         downstream_seq_id=downstream_seq_id,
         node_party=node_party,
         tls_config=tls_config,
+        compression=compression,
+        delta_edge=delta_edge,
+        quantization=quantization,
     )
     push_to_sending(res)
     return res
 
 
+def broadcast(
+    dest_parties,
+    data,
+    upstream_seq_id,
+    downstream_seq_id,
+    compression=None,
+):
+    """Send the same data to all of the parties asynchronously.
+
+    It's cheaper than calling `send` for every party, since the data is
+    serialized only once.
+    """
+    send_proxy = ray.get_actor("SendProxyActor")
+    res = send_proxy.broadcast.remote(
+        dest_parties=dest_parties,
+        data=data,
+        upstream_seq_id=upstream_seq_id,
+        downstream_seq_id=downstream_seq_id,
+        compression=compression,
+    )
+    push_to_sending(res)
+    return res
+
+
+def stop_send_proxy():
+    """Close the connections of the send proxy before it's killed."""
+    try:
+        send_proxy = ray.get_actor("SendProxyActor")
+    except ValueError:
+        return
+    ray.get(send_proxy.close.remote())
+
+
+def stop_recv_proxy(party: str):
+    """Clean up the recver proxy of this party before it's killed."""
+    try:
+        receiver_proxy = ray.get_actor(f"RecverProxyActor-{party}")
+    except ValueError:
+        return
+    ray.get(receiver_proxy.close.remote())
+
+
 def recv(party: str, upstream_seq_id, curr_seq_id):
     assert party, 'Party can not be None.'
     receiver_proxy = ray.get_actor(f"RecverProxyActor-{party}")
     return receiver_proxy.get_data.remote(upstream_seq_id, curr_seq_id)
+
+
+def reload_tls_credentials(party: str):
+    """Reload the tls certs of this party from the cert files in `tls_config`.
+
+    It's used for the certs rotation: after the cert files are replaced,
+    call this to make the new certs take effect without restarting.
+    """
+    send_proxy = ray.get_actor("SendProxyActor")
+    receiver_proxy = ray.get_actor(f"RecverProxyActor-{party}")
+    ray.get(
+        [
+            send_proxy.reload_tls_credentials.remote(),
+            receiver_proxy.reload_tls_credentials.remote(),
+        ]
+    )
@@ -26,12 +26,22 @@ class FedObject:
         fed_task_id: int,
         object_ref: ObjectRef,
         idx_in_task: int = 0,
+        delta_edge: str = None,
+        quantization: str = None,
     ) -> None:
         # The party name to exeute the task which produce this fed object.
         self._node_party = node_party
         self._object_ref = object_ref
         self._fed_task_id = fed_task_id
         self._idx_in_task = idx_in_task
+        # The parties this object has been sent to, it's sent to a party
+        # only once no matter how many tasks of that party consume it.
+        self._sent_parties = set()
+        # The name of the task producing this object if its outputs are
+        # delta encoded when sent.
+        self._delta_edge = delta_edge
+        # The quantization of the float arrays in this object when sent.
+        self._quantization = quantization
 
     def get_ray_object_ref(self):
         return self._object_ref
@@ -41,3 +51,22 @@ class FedObject:
 
     def get_party(self):
         return self._node_party
+
+    def _get_delta_edge(self):
+        if self._delta_edge is None:
+            return None
+        return f'{self._delta_edge}#{self._idx_in_task}'
+
+    def _mark_is_sending_to_party(self, target_party: str):
+        self._sent_parties.add(target_party)
+
+    def _was_sending_or_sent_to_party(self, target_party: str):
+        return target_party in self._sent_parties
+
+    def _cache_ray_object_ref(self, ray_object_ref):
+        """Cache the object ref of the data received from other party.
+
+        The following consumers of this object in current party reuse the
+        received data. It's released once this object is not referenced.
+        """
+        self._object_ref = ray_object_ref
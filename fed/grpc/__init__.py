@@ -11,3 +11,19 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+
+"""The generated protobuf and gRPC modules of the cross-silo transport.
+
+They're imported on the first access, e.g. `fed.grpc.fed_pb2`, since only
+the proxy actors need them rather than every `import fed`.
+"""
+
+import importlib
+
+_SUBMODULES = ("fed_pb2", "fed_pb2_grpc")
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
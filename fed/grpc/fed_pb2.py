@@ -19,7 +19,7 @@ DESCRIPTOR = _descriptor.FileDescriptor(
   syntax='proto3',
   serialized_options=b'\200\001\001',
   create_key=_descriptor._internal_create_key,
-  serialized_pb=b'\n\tfed.proto\"S\n\x0fSendDataRequest\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x17\n\x0fupstream_seq_id\x18\x02 \x01(\t\x12\x19\n\x11\x64ownstream_seq_id\x18\x03 \x01(\t\"\"\n\x10SendDataResponse\x12\x0e\n\x06result\x18\x01 \x01(\t2@\n\x0bGrpcService\x12\x31\n\x08SendData\x12\x10.SendDataRequest\x1a\x11.SendDataResponse\"\x00\x42\x03\x80\x01\x01\x62\x06proto3'
+  serialized_pb=b'\n\tfed.proto\"\xd3\x01\n\x0fSendDataRequest\x12\x0c\n\x04\x64\x61ta\x18\x01 \x01(\x0c\x12\x17\n\x0fupstream_seq_id\x18\x02 \x01(\t\x12\x19\n\x11\x64ownstream_seq_id\x18\x03 \x01(\t\x12\x12\n\ntotal_size\x18\x04 \x01(\x04\x12\r\n\x05\x63odec\x18\x05 \x01(\t\x12\x14\n\x0c\x63ontent_hash\x18\x06 \x01(\t\x12\x12\n\ndelta_edge\x18\x07 \x01(\t\x12\x15\n\rdelta_version\x18\x08 \x01(\x04\x12\x1a\n\x12\x64\x65lta_base_version\x18\t \x01(\x04\":\n\x14SendDataBatchRequest\x12\"\n\x08requests\x18\x01 \x03(\x0b\x32\x10.SendDataRequest\"\"\n\x10SendDataResponse\x12\x0e\n\x06result\x18\x01 \x01(\t2\xb8\x01\n\x0bGrpcService\x12\x31\n\x08SendData\x12\x10.SendDataRequest\x1a\x11.SendDataResponse\"\x00\x12\x39\n\x0eSendDataStream\x12\x10.SendDataRequest\x1a\x11.SendDataResponse\"\x00(\x01\x12;\n\rSendDataBatch\x12\x15.SendDataBatchRequest\x1a\x11.SendDataResponse\"\x00\x42\x03\x80\x01\x01\x62\x06proto3'
 )
 
 
@@ -54,6 +54,48 @@ _SENDDATAREQUEST = _descriptor.Descriptor(
       message_type=None, enum_type=None, containing_type=None,
       is_extension=False, extension_scope=None,
       serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='total_size', full_name='SendDataRequest.total_size', index=3,
+      number=4, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='codec', full_name='SendDataRequest.codec', index=4,
+      number=5, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='content_hash', full_name='SendDataRequest.content_hash', index=5,
+      number=6, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='delta_edge', full_name='SendDataRequest.delta_edge', index=6,
+      number=7, type=9, cpp_type=9, label=1,
+      has_default_value=False, default_value=b"".decode('utf-8'),
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='delta_version', full_name='SendDataRequest.delta_version', index=7,
+      number=8, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+    _descriptor.FieldDescriptor(
+      name='delta_base_version', full_name='SendDataRequest.delta_base_version', index=8,
+      number=9, type=4, cpp_type=4, label=1,
+      has_default_value=False, default_value=0,
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
   ],
   extensions=[
   ],
@@ -66,8 +108,40 @@ _SENDDATAREQUEST = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=13,
-  serialized_end=96,
+  serialized_start=14,
+  serialized_end=225,
+)
+
+
+_SENDDATABATCHREQUEST = _descriptor.Descriptor(
+  name='SendDataBatchRequest',
+  full_name='SendDataBatchRequest',
+  filename=None,
+  file=DESCRIPTOR,
+  containing_type=None,
+  create_key=_descriptor._internal_create_key,
+  fields=[
+    _descriptor.FieldDescriptor(
+      name='requests', full_name='SendDataBatchRequest.requests', index=0,
+      number=1, type=11, cpp_type=10, label=3,
+      has_default_value=False, default_value=[],
+      message_type=None, enum_type=None, containing_type=None,
+      is_extension=False, extension_scope=None,
+      serialized_options=None, file=DESCRIPTOR,  create_key=_descriptor._internal_create_key),
+  ],
+  extensions=[
+  ],
+  nested_types=[],
+  enum_types=[
+  ],
+  serialized_options=None,
+  is_extendable=False,
+  syntax='proto3',
+  extension_ranges=[],
+  oneofs=[
+  ],
+  serialized_start=227,
+  serialized_end=285,
 )
 
 
@@ -98,11 +172,13 @@ _SENDDATARESPONSE = _descriptor.Descriptor(
   extension_ranges=[],
   oneofs=[
   ],
-  serialized_start=98,
-  serialized_end=132,
+  serialized_start=287,
+  serialized_end=321,
 )
 
+_SENDDATABATCHREQUEST.fields_by_name['requests'].message_type = _SENDDATAREQUEST
 DESCRIPTOR.message_types_by_name['SendDataRequest'] = _SENDDATAREQUEST
+DESCRIPTOR.message_types_by_name['SendDataBatchRequest'] = _SENDDATABATCHREQUEST
 DESCRIPTOR.message_types_by_name['SendDataResponse'] = _SENDDATARESPONSE
 _sym_db.RegisterFileDescriptor(DESCRIPTOR)
 
@@ -113,6 +189,13 @@ SendDataRequest = _reflection.GeneratedProtocolMessageType('SendDataRequest', (_
   })
 _sym_db.RegisterMessage(SendDataRequest)
 
+SendDataBatchRequest = _reflection.GeneratedProtocolMessageType('SendDataBatchRequest', (_message.Message,), {
+  'DESCRIPTOR' : _SENDDATABATCHREQUEST,
+  '__module__' : 'fed_pb2'
+  # @@protoc_insertion_point(class_scope:SendDataBatchRequest)
+  })
+_sym_db.RegisterMessage(SendDataBatchRequest)
+
 SendDataResponse = _reflection.GeneratedProtocolMessageType('SendDataResponse', (_message.Message,), {
   'DESCRIPTOR' : _SENDDATARESPONSE,
   '__module__' : 'fed_pb2'
@@ -130,8 +213,8 @@ _GRPCSERVICE = _descriptor.ServiceDescriptor(
   index=0,
   serialized_options=None,
   create_key=_descriptor._internal_create_key,
-  serialized_start=134,
-  serialized_end=198,
+  serialized_start=324,
+  serialized_end=508,
   methods=[
   _descriptor.MethodDescriptor(
     name='SendData',
@@ -143,6 +226,26 @@ _GRPCSERVICE = _descriptor.ServiceDescriptor(
     serialized_options=None,
     create_key=_descriptor._internal_create_key,
   ),
+  _descriptor.MethodDescriptor(
+    name='SendDataStream',
+    full_name='GrpcService.SendDataStream',
+    index=1,
+    containing_service=None,
+    input_type=_SENDDATAREQUEST,
+    output_type=_SENDDATARESPONSE,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
+  _descriptor.MethodDescriptor(
+    name='SendDataBatch',
+    full_name='GrpcService.SendDataBatch',
+    index=2,
+    containing_service=None,
+    input_type=_SENDDATABATCHREQUEST,
+    output_type=_SENDDATARESPONSE,
+    serialized_options=None,
+    create_key=_descriptor._internal_create_key,
+  ),
 ])
 _sym_db.RegisterServiceDescriptor(_GRPCSERVICE)
 
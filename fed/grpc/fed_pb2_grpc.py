@@ -19,6 +19,16 @@ class GrpcServiceStub(object):
                 request_serializer=fed__pb2.SendDataRequest.SerializeToString,
                 response_deserializer=fed__pb2.SendDataResponse.FromString,
                 )
+        self.SendDataStream = channel.stream_unary(
+                '/GrpcService/SendDataStream',
+                request_serializer=fed__pb2.SendDataRequest.SerializeToString,
+                response_deserializer=fed__pb2.SendDataResponse.FromString,
+                )
+        self.SendDataBatch = channel.unary_unary(
+                '/GrpcService/SendDataBatch',
+                request_serializer=fed__pb2.SendDataBatchRequest.SerializeToString,
+                response_deserializer=fed__pb2.SendDataResponse.FromString,
+                )
 
 
 class GrpcServiceServicer(object):
@@ -30,6 +40,19 @@ class GrpcServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SendDataStream(self, request_iterator, context):
+        """Send a large data in chunks, the ids are only set in the first chunk.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SendDataBatch(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_GrpcServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -38,6 +61,16 @@ def add_GrpcServiceServicer_to_server(servicer, server):
                     request_deserializer=fed__pb2.SendDataRequest.FromString,
                     response_serializer=fed__pb2.SendDataResponse.SerializeToString,
             ),
+            'SendDataStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.SendDataStream,
+                    request_deserializer=fed__pb2.SendDataRequest.FromString,
+                    response_serializer=fed__pb2.SendDataResponse.SerializeToString,
+            ),
+            'SendDataBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.SendDataBatch,
+                    request_deserializer=fed__pb2.SendDataBatchRequest.FromString,
+                    response_serializer=fed__pb2.SendDataResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'GrpcService', rpc_method_handlers)
@@ -64,3 +97,37 @@ class GrpcService(object):
             fed__pb2.SendDataResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SendDataStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(request_iterator, target, '/GrpcService/SendDataStream',
+            fed__pb2.SendDataRequest.SerializeToString,
+            fed__pb2.SendDataResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SendDataBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/GrpcService/SendDataBatch',
+            fed__pb2.SendDataBatchRequest.SerializeToString,
+            fed__pb2.SendDataResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -14,43 +14,50 @@
 
 import logging
 
-import jax
 import ray
 
+from fed._private.tree_util import replace_instances
 from fed.fed_object import FedObject
 
 logger = logging.getLogger(__name__)
 
+# The options of `.options()` handled by rayfed rather than ray, see
+# `FedRemoteFunction.options`.
+RAYFED_OPTIONS = ("delta_encoding", "quantization")
+
 
 def resolve_dependencies(current_party, current_fed_task_id, *args, **kwargs):
     from fed.barriers import recv
-    flattened_args, tree = jax.tree_util.tree_flatten((args, kwargs))
-    indexes = []
-    resolved = []
-    for idx, arg in enumerate(flattened_args):
-        if isinstance(arg, FedObject):
-            indexes.append(idx)
-            if arg.get_party() == current_party:
-                logger.debug(
-                    f"[{current_party}] Insert fed object, arg.party={arg.get_party()}"
-                )
-                resolved.append(arg.get_ray_object_ref())
-            else:
-                logger.debug(
-                    f"[{current_party}] Insert recv_op, arg task id {arg.get_fed_task_id()}, current task id {current_fed_task_id}"
-                )
-                recv_obj = recv(
-                    current_party, arg.get_fed_task_id(), current_fed_task_id
-                )
-                resolved.append(recv_obj)
-    if resolved:
-        for idx, actual_val in zip(indexes, resolved):
-            flattened_args[idx] = actual_val
-
-    resolved_args, resolved_kwargs = jax.tree_util.tree_unflatten(tree, flattened_args)
+
+    def _resolve(arg):
+        if arg.get_party() == current_party:
+            logger.debug(
+                f"[{current_party}] Insert fed object, arg.party={arg.get_party()}"
+            )
+            return arg.get_ray_object_ref()
+        if arg.get_ray_object_ref() is not None:
+            # It has been received for another task.
+            return arg.get_ray_object_ref()
+        logger.debug(
+            f"[{current_party}] Insert recv_op, arg task id {arg.get_fed_task_id()}, current task id {current_fed_task_id}"
+        )
+        recv_obj = recv(current_party, arg.get_fed_task_id(), current_fed_task_id)
+        arg._cache_ray_object_ref(recv_obj)
+        return recv_obj
+
+    resolved_args, resolved_kwargs = replace_instances(
+        (args, kwargs), FedObject, _resolve
+    )
     return resolved_args, resolved_kwargs
 
 
+def get_ray_options(options):
+    """Get the options to pass to ray, without the rayfed ones."""
+    if not any(option in options for option in RAYFED_OPTIONS):
+        return options
+    return {k: v for k, v in options.items() if k not in RAYFED_OPTIONS}
+
+
 def is_ray_object_refs(objects) -> bool:
     if isinstance(objects, ray.ObjectRef):
         return True
@@ -57,6 +57,6 @@ setup(
     url='https://github.com/secretflow/rayfed',
     packages=find_packages(exclude=('examples', 'tests', 'tests.*')),
     install_requires=read_requirements(),
-    extras_require={'dev': ['pylint']},
+    extras_require={'dev': ['pylint'], 'compression': ['lz4', 'zstandard']},
     options={'bdist_wheel': {'plat_name': plat_name}},
 )
@@ -0,0 +1,51 @@
+#!/bin/bash
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Generate the certs used by the TLS tests, run it again if they expire.
+#
+# - alice_certs: the CA, and the server cert and key signed by it.
+# - alice_rotated_certs: another server cert and key signed by the same CA,
+#   which replace those of alice_certs in the tests of reloading the certs.
+
+set -e
+
+cd "$(dirname "$0")"
+DAYS=36500
+TMP_DIR=$(mktemp -d)
+trap 'rm -rf "$TMP_DIR"' EXIT
+
+cat > "$TMP_DIR/server.ext" <<END
+basicConstraints = CA:FALSE
+keyUsage = digitalSignature, keyEncipherment
+subjectAltName = DNS:127.0.0.1, DNS:localhost, IP:127.0.0.1
+END
+
+mkdir -p alice_certs alice_rotated_certs
+openssl req -x509 -newkey rsa:2048 -nodes -days $DAYS \
+    -keyout "$TMP_DIR/cakey.pem" -out alice_certs/cacert.pem \
+    -subj "/C=US/ST=Maryland/L=Baltimore/O=Test CA, Limited/CN=Test CA" \
+    -addext "basicConstraints = critical, CA:TRUE" \
+    -addext "keyUsage = keyCertSign, cRLSign"
+
+for dir in alice_certs alice_rotated_certs; do
+    openssl req -newkey rsa:2048 -nodes \
+        -keyout $dir/serverkey.pem -out "$TMP_DIR/server.csr" \
+        -subj "/C=US/ST=MD/L=Baltimore/O=Test Server, Limited/CN=Test Server"
+    openssl x509 -req -in "$TMP_DIR/server.csr" -days $DAYS \
+        -CA alice_certs/cacert.pem -CAkey "$TMP_DIR/cakey.pem" \
+        -CAserial "$TMP_DIR/cacert.srl" -CAcreateserial \
+        -extfile "$TMP_DIR/server.ext" -out $dir/servercert.pem
+done
+cp alice_certs/cacert.pem alice_rotated_certs/cacert.pem
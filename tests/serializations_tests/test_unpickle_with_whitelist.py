@@ -18,8 +18,13 @@ import os
 import fed
 import multiprocessing
 import numpy
+import pickle
+import collections
+import pytest
 import ray
 
+from fed._private import serialization_utils
+
 
 @fed.remote
 def generate_wrong_type():
@@ -87,6 +92,30 @@ def test_restricted_loads():
     assert p_alice.exitcode == 0 and p_bob.exitcode == 0
 
 
+def test_allowed_list_decisions():
+    serialization_utils._set_pickle_whitelist({"collections": ["OrderedDict"]})
+    try:
+        assert serialization_utils._restricted_loads(
+            pickle.dumps(collections.OrderedDict(a=1))
+        ) == collections.OrderedDict(a=1)
+        with pytest.raises(pickle.UnpicklingError):
+            serialization_utils._restricted_loads(
+                pickle.dumps(collections.Counter(a=1))
+            )
+        assert serialization_utils._is_allowed.cache_info().currsize == 2
+        # The allowed list is not loaded again.
+        assert serialization_utils._load_pickle_whitelist()
+
+        # The decisions memoized are bounded.
+        size = serialization_utils._FIND_CLASS_DECISIONS_SIZE
+        for i in range(size + 10):
+            serialization_utils._is_allowed(f"module{i}", "name")
+        assert serialization_utils._is_allowed.cache_info().currsize == size
+    finally:
+        serialization_utils.reset_pickle_whitelist()
+    assert serialization_utils._is_allowed.cache_info().currsize == 0
+
+
 if __name__ == "__main__":
     import sys
 
@@ -25,6 +25,12 @@ def run():
     fed.init(address='local', cluster=cluster, party="alice")
     assert fed.get_cluster() == cluster
     assert fed.get_party() == "alice"
+    # The configs are cached in this process.
+    assert fed.get_cluster() is fed.get_cluster()
+    fed.shutdown()
+
+    fed.init(address='local', cluster=cluster, party="bob")
+    assert fed.get_party() == "bob"
     fed.shutdown()
 
 
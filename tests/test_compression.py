@@ -0,0 +1,97 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import concurrent.futures
+
+import pytest
+
+import ray
+
+import fed._private.compression as fed_compression
+from fed.barriers import RecverProxyActor, send, start_send_proxy
+from fed.cleanup import wait_sending
+
+
+@pytest.mark.parametrize("codec", ["gzip", "lz4", "zstd"])
+def test_compress_and_decompress(codec):
+    if codec == "lz4":
+        pytest.importorskip("lz4")
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    data = b"rayfed" * 10000
+    used_codec, compressed = fed_compression.compress(data, codec, 1024)
+    assert used_codec == codec
+    assert len(compressed) < len(data)
+    assert fed_compression.decompress(compressed, used_codec) == data
+
+
+@pytest.mark.parametrize("codec", ["gzip", "lz4", "zstd"])
+def test_compress_in_threads(codec):
+    if codec == "lz4":
+        pytest.importorskip("lz4")
+    if codec == "zstd":
+        pytest.importorskip("zstandard")
+    datas = [bytes([i]) * 100000 + b"rayfed" * i for i in range(64)]
+
+    def compress_and_decompress(data):
+        used_codec, compressed = fed_compression.compress(data, codec, 0)
+        return fed_compression.decompress(compressed, used_codec)
+
+    with concurrent.futures.ThreadPoolExecutor(16) as executor:
+        for _ in range(5):
+            assert list(executor.map(compress_and_decompress, datas)) == datas
+
+
+def test_skip_small_data():
+    data = b"rayfed"
+    used_codec, compressed = fed_compression.compress(data, "gzip", 1024)
+    assert used_codec == fed_compression.NONE
+    assert compressed is data
+
+
+def test_unsupported_codec():
+    with pytest.raises(ValueError):
+        fed_compression.check_codec("snappy")
+
+
+def test_send_compressed_data():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12347"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        compression="gzip",
+        compression_threshold=0,
+    )
+
+    data = "data" * 10000
+    assert ray.get(send('test_party', data, 0, 1))
+    assert ray.get(recver_proxy_actor.get_data.remote(0, 1)) == data
+    # Override the codec of `fed.init` for this data.
+    assert ray.get(send('test_party', data, 1, 2, compression="none"))
+    assert ray.get(recver_proxy_actor.get_data.remote(1, 2)) == data
+
+    wait_sending()
+    ray.shutdown()
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
@@ -0,0 +1,108 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+
+import numpy as np
+import pytest
+import ray
+
+import fed
+import fed._private.delta_encoding as fed_delta_encoding
+
+
+def test_encode_decode():
+    base = np.random.rand(10000)
+    data = base.copy()
+    data[:10] += 1
+    codec, delta = fed_delta_encoding.encode(data.tobytes(), base.tobytes(), None)
+    assert codec == "gzip"
+    assert len(delta) < data.nbytes / 10
+    decoded = fed_delta_encoding.decode(delta, base.tobytes(), codec)
+    np.testing.assert_array_equal(np.frombuffer(decoded), data)
+
+
+def test_encode_dense_small_update():
+    # Every element of a float32 model is changed slightly, the delta is
+    # only somewhat smaller than the data.
+    rng = np.random.default_rng(0)
+    base = rng.standard_normal(100000).astype(np.float32)
+    data = base - 1e-3 * rng.standard_normal(base.size).astype(np.float32) * base
+    codec, delta = fed_delta_encoding.encode(data.tobytes(), base.tobytes(), None)
+    assert data.nbytes / 2 < len(delta) < data.nbytes / 1.2
+    decoded = fed_delta_encoding.decode(delta, base.tobytes(), codec)
+    np.testing.assert_array_equal(np.frombuffer(decoded, dtype=np.float32), data)
+
+
+def test_delta_bases():
+    bases = fed_delta_encoding.DeltaBases()
+    assert bases.next_version("edge", b"1") == (1, 0, None)
+    assert bases.next_version("edge", b"2") == (2, 1, b"1")
+    assert bases.get("edge", 2) == b"2"
+    assert bases.get("edge", 1) is None
+    # The older version is not kept.
+    bases.update("edge", 1, b"1")
+    assert bases.get("edge", 2) == b"2"
+
+
+@fed.remote
+def train(model, step):
+    model = model.copy()
+    model[step] += 1
+    return model
+
+
+@fed.remote
+def evaluate(model):
+    return float(model.sum())
+
+
+def run(party):
+    cluster = {
+        'alice': {'address': '127.0.0.1:11012'},
+        'bob': {'address': '127.0.0.1:11013'},
+    }
+    fed.init(address='local', cluster=cluster, party=party)
+
+    model = np.zeros(100000)
+    expected = []
+    results = []
+    for step in range(5):
+        model = train.party("alice").options(delta_encoding=True).remote(model, step)
+        results.append(evaluate.party("bob").remote(model))
+        expected.append(float(step + 1))
+    assert fed.get(results) == expected
+
+    if party == "alice":
+        send_proxy = ray.get_actor("SendProxyActor")
+        stats = ray.get(send_proxy.get_stats.remote())
+        # The model is sent in full only in the first round.
+        assert stats["delta_saved_bytes"] > 3 * 100000 * 8
+    fed.shutdown()
+
+
+def test_delta_encoding():
+    p_alice = multiprocessing.Process(target=run, args=('alice',))
+    p_bob = multiprocessing.Process(target=run, args=('bob',))
+    p_alice.start()
+    p_bob.start()
+    p_alice.join()
+    p_bob.join()
+    assert p_alice.exitcode == 0 and p_bob.exitcode == 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
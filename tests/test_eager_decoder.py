@@ -0,0 +1,64 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+import fed._private.compression as fed_compression
+from fed._private.eager_decoder import EagerDecoder
+
+DATA = b"rayfed" * 10000
+
+
+def test_eager_decoding():
+    async def _run():
+        decoder = EagerDecoder(budget=1024 * 1024)
+        codec, compressed = fed_compression.compress(DATA, "gzip", 0)
+        data, codec = decoder.submit(compressed, codec)
+        assert codec == fed_compression.NONE
+        assert await decoder.result(data) == DATA
+        assert decoder.get_stats()["eager_decoding_bytes"] == 0
+
+    asyncio.run(_run())
+
+
+def test_eager_decoding_beyond_budget():
+    async def _run():
+        decoder = EagerDecoder(budget=1)
+        codec, compressed = fed_compression.compress(DATA, "gzip", 0)
+        data_1, codec_1 = decoder.submit(compressed, codec)
+        # The budget is used up, so it's left to the consumer.
+        data_2, codec_2 = decoder.submit(compressed, codec)
+        assert codec_1 == fed_compression.NONE
+        assert (data_2, codec_2) == (compressed, "gzip")
+        assert await decoder.result(data_1) == DATA
+        assert await decoder.result(data_2) == compressed
+
+    asyncio.run(_run())
+
+
+def test_eager_decoding_disabled():
+    async def _run():
+        decoder = EagerDecoder(budget=0)
+        codec, compressed = fed_compression.compress(DATA, "gzip", 0)
+        assert decoder.submit(compressed, codec) == (compressed, "gzip")
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
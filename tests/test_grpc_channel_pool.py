@@ -0,0 +1,72 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from fed._private.grpc_channel_pool import GrpcChannelPool
+
+DEST = "127.0.0.1:12345"
+
+
+def test_reuse_channel():
+    async def _run():
+        pool = GrpcChannelPool()
+        async with pool.acquire("bob", DEST) as stub_1:
+            pass
+        async with pool.acquire("bob", DEST) as stub_2:
+            pass
+        async with pool.acquire("carol", DEST) as stub_3:
+            pass
+        assert stub_1 is stub_2
+        assert stub_1 is not stub_3
+        await pool.close()
+
+    asyncio.run(_run())
+
+
+def test_max_streams_per_channel():
+    async def _run():
+        pool = GrpcChannelPool(max_streams_per_channel=1)
+        async with pool.acquire("bob", DEST) as stub_1:
+            async with pool.acquire("bob", DEST) as stub_2:
+                assert stub_1 is not stub_2
+        async with pool.acquire("bob", DEST) as stub_3:
+            assert stub_3 is stub_1
+        await pool.close()
+
+    asyncio.run(_run())
+
+
+def test_evict_idle_channel():
+    async def _run():
+        pool = GrpcChannelPool(idle_timeout_s=0.1)
+        async with pool.acquire("bob", DEST) as stub_1:
+            pass
+        await asyncio.sleep(0.2)
+        async with pool.acquire("bob", DEST) as stub_2:
+            pass
+        assert stub_1 is not stub_2
+        assert len(pool._closing_tasks) == 1
+        await pool.close()
+        assert not pool._closing_tasks
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
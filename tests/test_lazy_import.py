@@ -0,0 +1,48 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import subprocess
+import sys
+
+import pytest
+
+_LAZY_MODULES = ["numpy", "jax", "fed.grpc.fed_pb2", "fed.grpc.fed_pb2_grpc"]
+
+
+def test_import_fed_is_lazy():
+    code = (
+        "import sys, logging\n"
+        "import fed\n"
+        "print(','.join(m for m in %r if m in sys.modules))\n"
+        "print(len(logging.getLogger().handlers))\n" % _LAZY_MODULES
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    ).stdout.splitlines()
+    assert out[0] == ""
+    # No logging handler is installed as a side effect of the import.
+    assert out[1] == "0"
+
+
+def test_grpc_modules_loaded_on_first_use():
+    import fed.grpc as fed_grpc
+
+    assert fed_grpc.fed_pb2.SendDataRequest(data=b"x").data == b"x"
+    assert fed_grpc.fed_pb2_grpc.GrpcServiceStub is not None
+    with pytest.raises(AttributeError):
+        fed_grpc.not_a_module
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main(["-sv", __file__]))
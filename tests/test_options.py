@@ -41,6 +41,16 @@ def run(party):
 
     assert a == 2 and b == 3
     assert c == 1 and d == 4
+
+    # The methods are reused, and the options don't change the default one.
+    assert foo.run is foo.run
+    assert foo.run.options(num_returns=2) is foo.run.options(num_returns=2)
+    assert fed.get(foo.run.remote()) == (2, 3)
+
+    # The changed options take effect on the reused ray remote function.
+    ray_remote_func = bar._ray_remote_func
+    assert fed.get(bar.party("bob").options(num_returns=1).remote(2)) == (1, 4)
+    assert bar._ray_remote_func is ray_remote_func
     
     fed.shutdown()
 
@@ -0,0 +1,113 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+
+import numpy as np
+import pytest
+
+import fed
+import fed._private.serialization_utils as fed_ser_utils
+
+
+def _frames_size(frames):
+    return sum(memoryview(frame).nbytes for frame in frames)
+
+
+@pytest.mark.parametrize(
+    "quantization, ratio, tolerance",
+    [("fp16", 2, 1e-3), ("bf16", 2, 1e-2), ("int8", 4, 1e-2)],
+)
+def test_quantize_arrays(quantization, ratio, tolerance):
+    array = np.random.randn(10000).astype(np.float32)
+    data = {"array": array, "ints": np.arange(10), "name": "model"}
+    frames = fed_ser_utils.dumps_frames(data, quantization)
+    assert _frames_size(frames) < array.nbytes / ratio + 1024
+
+    loaded = fed_ser_utils.loads_frames(b"".join(frames))
+    assert loaded["array"].dtype == np.float32
+    assert loaded["array"].shape == array.shape
+    np.testing.assert_allclose(
+        loaded["array"], array, atol=tolerance * np.abs(array).max(), rtol=0
+    )
+    np.testing.assert_array_equal(loaded["ints"], np.arange(10))
+    assert loaded["name"] == "model"
+
+
+def test_quantize_out_of_range():
+    array = np.array([1e6, -1e6, 1.0, np.inf])
+    loaded = fed_ser_utils.loads_frames(
+        b"".join(fed_ser_utils.dumps_frames(array, "fp16"))
+    )
+    assert loaded.dtype == np.float64
+    np.testing.assert_allclose(loaded[:3], array[:3], rtol=1e-2, atol=100)
+    assert np.isinf(loaded[3])
+
+
+def test_quantize_non_finite_int8():
+    array = np.random.randn(10000).astype(np.float32)
+    array[:3] = [np.nan, np.inf, -np.inf]
+    frames = fed_ser_utils.dumps_frames(array, "int8")
+    # Fall back to fp16, which keeps NaN and infinity.
+    assert _frames_size(frames) < array.nbytes / 2 + 1024
+    loaded = fed_ser_utils.loads_frames(b"".join(frames))
+    assert loaded.dtype == np.float32
+    assert np.isnan(loaded[0])
+    assert loaded[1] == np.inf and loaded[2] == -np.inf
+    np.testing.assert_allclose(loaded[3:], array[3:], rtol=1e-3, atol=1e-3)
+
+
+def test_unsupported_quantization():
+    with pytest.raises(ValueError):
+        fed_ser_utils.dumps_frames(np.zeros(10), "fp8")
+
+
+@fed.remote
+def compute_gradient():
+    return np.linspace(-1, 1, 10000)
+
+
+@fed.remote
+def apply_gradient(gradient):
+    assert gradient.dtype == np.float64
+    return float(np.abs(gradient - np.linspace(-1, 1, 10000)).max())
+
+
+def run(party):
+    cluster = {
+        'alice': {'address': '127.0.0.1:11014'},
+        'bob': {'address': '127.0.0.1:11015'},
+    }
+    fed.init(address='local', cluster=cluster, party=party)
+
+    gradient = compute_gradient.party("alice").options(quantization="int8").remote()
+    error = fed.get(apply_gradient.party("bob").remote(gradient))
+    assert 0 < error < 1e-2
+    fed.shutdown()
+
+
+def test_quantization_option():
+    p_alice = multiprocessing.Process(target=run, args=('alice',))
+    p_bob = multiprocessing.Process(target=run, args=('bob',))
+    p_alice.start()
+    p_bob.start()
+    p_alice.join()
+    p_bob.join()
+    assert p_alice.exitcode == 0 and p_bob.exitcode == 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
@@ -0,0 +1,67 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import pickle
+
+import numpy as np
+import pytest
+
+import fed._private.compression as fed_compression
+import fed._private.serialization_utils as fed_ser_utils
+
+
+def _receive(data, codec):
+    serialized = b"".join(bytes(frame) for frame in fed_ser_utils.dumps_frames(data))
+    codec, encoded = fed_compression.compress(serialized, codec, 0)
+    return fed_ser_utils.ReceivedData(encoded, codec), len(encoded)
+
+
+@pytest.mark.parametrize("codec", ["none", "gzip"])
+def test_decode_when_deserialized(codec):
+    fed_ser_utils._set_pickle_whitelist(None)
+    try:
+        data = {"array": np.arange(100000), "step": 1}
+        received, size = _receive(data, codec)
+        # The received bytes are pickled as an out-of-band buffer as is,
+        # rather than decoded and pickled again.
+        buffers = []
+        pickled = pickle.dumps(received, protocol=5, buffer_callback=buffers.append)
+        assert len(pickled) < 1024
+        assert [buffer.raw().nbytes for buffer in buffers] == [size]
+
+        decoded = pickle.loads(pickled, buffers=buffers)
+        np.testing.assert_array_equal(decoded["array"], data["array"])
+        assert decoded["step"] == 1
+    finally:
+        fed_ser_utils.reset_pickle_whitelist()
+
+
+def test_allowed_list_applied_when_deserialized():
+    fed_ser_utils._set_pickle_whitelist({"builtins": ["*"]})
+    try:
+        received, _ = _receive({"a": 1}, "none")
+        assert pickle.loads(pickle.dumps(received, protocol=5)) == {"a": 1}
+
+        received, _ = _receive(collections.OrderedDict(a=1), "none")
+        with pytest.raises(pickle.UnpicklingError):
+            pickle.loads(pickle.dumps(received, protocol=5))
+    finally:
+        fed_ser_utils.reset_pickle_whitelist()
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
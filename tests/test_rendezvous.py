@@ -0,0 +1,99 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import asyncio
+
+import pytest
+
+from fed._private.rendezvous import RendezvousTable, rendezvous_key
+
+
+def test_put_before_claim():
+    async def _run():
+        table = RendezvousTable()
+        table.put(rendezvous_key(1, 2), "data")
+        assert await table.claim(rendezvous_key("1", "2")) == "data"
+        assert len(table) == 0
+
+    asyncio.run(_run())
+
+
+def test_claim_before_put():
+    async def _run():
+        table = RendezvousTable()
+        claiming = asyncio.ensure_future(table.claim(rendezvous_key(1, 2)))
+        await asyncio.sleep(0)
+        assert not claiming.done()
+        table.put(rendezvous_key(1, 2), "data")
+        assert await claiming == "data"
+        assert len(table) == 0
+
+    asyncio.run(_run())
+
+
+def test_duplicate_put_racing_claim():
+    async def _run():
+        table = RendezvousTable()
+        claiming = asyncio.ensure_future(table.claim(rendezvous_key(1, 2)))
+        await asyncio.sleep(0)
+        assert table.put(rendezvous_key(1, 2), "data", size=4)
+        # Sent again before the consumer resumes from the first one.
+        assert not table.put(rendezvous_key(1, 2), "data", size=4)
+        assert await claiming == "data"
+        assert len(table) == 0
+        assert table.queued_bytes == 0
+
+    asyncio.run(_run())
+
+
+def test_cancel_claim():
+    async def _run():
+        table = RendezvousTable()
+        claiming = asyncio.ensure_future(table.claim(rendezvous_key(1, 2)))
+        await asyncio.sleep(0)
+        claiming.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await claiming
+        assert len(table) == 0
+        # The data can still be claimed by the next consumer.
+        table.put(rendezvous_key(1, 2), "data")
+        assert await table.claim(rendezvous_key(1, 2)) == "data"
+
+    asyncio.run(_run())
+
+
+def test_evict_stale_entries():
+    async def _run():
+        table = RendezvousTable()
+        table.put(rendezvous_key(1, 2), "data", size=4)
+        claiming = asyncio.ensure_future(table.claim(rendezvous_key(2, 3)))
+        await asyncio.sleep(0.1)
+        assert table.stale_entries(1) == []
+        entries = {key: value for key, _, value in table.stale_entries(0)}
+        assert entries == {("1", "2"): "data", ("2", "3"): None}
+
+        for key in entries:
+            table.evict(key, TimeoutError())
+        with pytest.raises(TimeoutError):
+            await claiming
+        assert len(table) == 0
+        assert table.queued_bytes == 0
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
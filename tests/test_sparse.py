@@ -0,0 +1,110 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+import fed
+import fed._private.serialization_utils as fed_ser_utils
+
+
+def _sparse_array(size=100000, nnz=100, dtype=np.float32):
+    array = np.zeros(size, dtype=dtype)
+    array[np.random.choice(size, nnz, replace=False)] = np.random.rand(nnz) + 1
+    return array
+
+
+def _dumps(data, **kwargs):
+    return b"".join(fed_ser_utils.dumps_frames(data, **kwargs))
+
+
+def test_detect_sparse_arrays():
+    sparse = _sparse_array().reshape(100, 1000)
+    dense = np.random.rand(10000)
+    data = {"sparse": sparse, "dense": dense}
+    serialized = _dumps(data, sparsity_threshold=0.9)
+    assert len(serialized) < sparse.nbytes / 10 + dense.nbytes + 1024
+
+    loaded = fed_ser_utils.loads_frames(serialized)
+    assert loaded["sparse"].dtype == sparse.dtype
+    np.testing.assert_array_equal(loaded["sparse"], sparse)
+    np.testing.assert_array_equal(loaded["dense"], dense)
+
+
+def test_skip_non_numeric_arrays():
+    structured = np.zeros(10000, dtype=[("x", np.float32), ("y", np.int64)])
+    strings = np.zeros(10000, dtype="U4")
+    datetimes = np.zeros(10000, dtype="datetime64[s]")
+    data = {"structured": structured, "strings": strings, "datetimes": datetimes}
+    loaded = fed_ser_utils.loads_frames(_dumps(data, sparsity_threshold=0.9))
+    for key, array in data.items():
+        assert loaded[key].dtype == array.dtype
+        np.testing.assert_array_equal(loaded[key], array)
+
+
+def test_sparse_array():
+    array = _sparse_array()
+    serialized = _dumps(fed.SparseArray.from_dense(array))
+    assert len(serialized) < array.nbytes / 10
+
+    loaded = fed_ser_utils.loads_frames(serialized)
+    assert isinstance(loaded, fed.SparseArray)
+    assert loaded.nnz == 100
+    np.testing.assert_array_equal(np.asarray(loaded), array)
+    assert loaded.todense() is loaded.todense()
+
+
+def test_quantize_sparse_values():
+    array = _sparse_array(dtype=np.float64)
+    loaded = fed_ser_utils.loads_frames(
+        _dumps(array, quantization="fp16", sparsity_threshold=0.9)
+    )
+    assert loaded.dtype == np.float64
+    assert np.count_nonzero(loaded) == 100
+    np.testing.assert_allclose(loaded, array, rtol=1e-3)
+
+
+def test_load_with_allowed_list():
+    serialized = _dumps(
+        [_sparse_array(), fed.SparseArray.from_dense(_sparse_array())],
+        sparsity_threshold=0.9,
+    )
+    fed_ser_utils._set_pickle_whitelist(
+        {
+            "numpy": ["*"],
+            "numpy.core.numeric": ["*"],
+            "numpy.core.multiarray": ["*"],
+        }
+    )
+    try:
+        loaded = fed_ser_utils.loads_frames(
+            serialized, loads=fed_ser_utils._restricted_loads
+        )
+    finally:
+        fed_ser_utils.reset_pickle_whitelist()
+    assert np.count_nonzero(loaded[0]) == 100
+    assert loaded[1].nnz == 100
+
+
+def test_invalid_sparsity_threshold():
+    from fed._private.sparse import check_sparsity_threshold
+
+    with pytest.raises(ValueError):
+        check_sparsity_threshold(1.5)
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
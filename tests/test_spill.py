@@ -0,0 +1,73 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+import fed
+
+
+@fed.remote
+def produce(i):
+    return np.full(10000, i, dtype=np.float64)
+
+
+@fed.remote
+def consume(data):
+    return float(data.sum())
+
+
+def run(party, spill_dir):
+    cluster = {
+        'alice': {'address': '127.0.0.1:11016'},
+        'bob': {'address': '127.0.0.1:11017'},
+    }
+    fed.init(
+        address='local',
+        cluster=cluster,
+        party=party,
+        cross_silo_recv_spill_policy={"watermark_bytes": 1, "spill_dir": spill_dir},
+    )
+    results = [
+        consume.party("bob").remote(produce.party("alice").remote(i)) for i in range(3)
+    ]
+    assert fed.get(results) == [10000.0 * i for i in range(3)]
+    fed.shutdown()
+
+
+def test_remove_spilled_files_on_shutdown(tmp_path):
+    spill_dirs = {party: str(tmp_path / party) for party in ["alice", "bob"]}
+    for spill_dir in spill_dirs.values():
+        os.makedirs(spill_dir)
+    processes = [
+        multiprocessing.Process(target=run, args=(party, spill_dir))
+        for party, spill_dir in spill_dirs.items()
+    ]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
+    assert all(p.exitcode == 0 for p in processes)
+    # The directories made in the spill dirs are removed.
+    for spill_dir in spill_dirs.values():
+        assert os.listdir(spill_dir) == []
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
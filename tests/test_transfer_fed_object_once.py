@@ -0,0 +1,68 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing
+
+import pytest
+import ray
+
+import fed
+from fed._private.serialization_utils import dumps_frames
+
+
+@fed.remote
+def generate_model():
+    return list(range(1000))
+
+
+@fed.remote
+def train(model, step):
+    return sum(model) + step
+
+
+def run(party):
+    cluster = {
+        'alice': {'address': '127.0.0.1:11010'},
+        'bob': {'address': '127.0.0.1:11011'},
+    }
+    fed.init(address='local', cluster=cluster, party=party)
+
+    model = generate_model.party("alice").remote()
+    results = [train.party("bob").remote(model, step) for step in range(5)]
+    assert fed.get(results) == [sum(range(1000)) + step for step in range(5)]
+    assert fed.get(model) == list(range(1000))
+
+    if party == "alice":
+        send_proxy = ray.get_actor("SendProxyActor")
+        stats = ray.get(send_proxy.get_stats.remote())
+        # The model is sent to bob only once.
+        model_size = sum(len(frame) for frame in dumps_frames(list(range(1000))))
+        assert model_size <= stats["serialized_bytes"] < 2 * model_size
+    fed.shutdown()
+
+
+def test_transfer_fed_object_once():
+    p_alice = multiprocessing.Process(target=run, args=('alice',))
+    p_bob = multiprocessing.Process(target=run, args=('bob',))
+    p_alice.start()
+    p_bob.start()
+    p_alice.join()
+    p_bob.join()
+    assert p_alice.exitcode == 0 and p_bob.exitcode == 0
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))
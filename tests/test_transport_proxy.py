@@ -12,12 +12,27 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import asyncio
+import time
+
+import grpc
+import numpy as np
 import pytest
 
 import ray
 
-from fed.barriers import RecverProxyActor, send, start_send_proxy
+import fed._private.content_dedup as fed_content_dedup
+from fed._private.serialization_utils import dumps_frames
+
+from fed.barriers import (
+    RecverProxyActor,
+    _received_data_size,
+    broadcast,
+    send,
+    start_send_proxy,
+)
 from fed.cleanup import wait_sending
+from fed.grpc import fed_pb2, fed_pb2_grpc
 
 
 def test_n_to_1_transport():
@@ -52,6 +67,552 @@ def test_n_to_1_transport():
     ray.shutdown()
 
 
+def test_send_data_in_chunks():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12345"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}}, 'test_party', chunk_size=1024
+    )
+
+    data = [bytes([i % 256]) * 1000 for i in range(100)]
+    assert ray.get(send('test_party', data, 0, 1))
+    assert ray.get(recver_proxy_actor.get_data.remote(0, 1)) == data
+    # Still sent in one message if the data is smaller than the chunk size.
+    assert ray.get(send('test_party', "small-data", 1, 2))
+    assert ray.get(recver_proxy_actor.get_data.remote(1, 2)) == "small-data"
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_reject_malformed_data_streams():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12363"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+
+    def _request(data, total_size=4):
+        return fed_pb2.SendDataRequest(
+            data=data, upstream_seq_id="0", downstream_seq_id="1", total_size=total_size
+        )
+
+    streams = [
+        # Larger than the total size.
+        [_request(b"1" * 4), _request(b"2" * 16)],
+        # Smaller than the total size.
+        [_request(b"12")],
+        [],
+    ]
+    with grpc.insecure_channel(SERVER_ADDRESS) as channel:
+        grpc.channel_ready_future(channel).result(timeout=30)
+        stub = fed_pb2_grpc.GrpcServiceStub(channel)
+        for requests in streams:
+            with pytest.raises(grpc.RpcError) as e:
+                stub.SendDataStream(iter(requests))
+            assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert stats["receiving_bytes"] == 0
+    assert stats["queued_messages"] == 0
+
+    ray.shutdown()
+
+
+@pytest.mark.parametrize("chunk_size", [1024, None])
+def test_send_numpy_arrays(chunk_size):
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12346"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        chunk_size=chunk_size,
+    )
+
+    # The arrays are sent as out-of-band buffers.
+    data = {"weights": np.random.rand(100, 100), "bias": np.arange(10), "step": 1}
+    assert ray.get(send('test_party', data, 0, 1))
+    received = ray.get(recver_proxy_actor.get_data.remote(0, 1))
+    assert received["step"] == 1
+    np.testing.assert_array_equal(received["weights"], data["weights"])
+    np.testing.assert_array_equal(received["bias"], data["bias"])
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_batch_small_messages():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12359"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        batching_policy={"window_us": 200000},
+    )
+    send_proxy = ray.get_actor("SendProxyActor")
+
+    # The messages sent together are coalesced into one rpc.
+    assert all(ray.get([send('test_party', i, i, i + 1) for i in range(5)]))
+    for i in range(5):
+        assert ray.get(recver_proxy_actor.get_data.remote(i, i + 1)) == i
+    stats = ray.get(send_proxy.get_stats.remote())
+    assert stats["sent_batches"] == 1
+    assert stats["batched_messages"] == 5
+
+    # A message alone is sent after the window.
+    start = time.time()
+    assert ray.get(send('test_party', 5, 5, 6))
+    assert time.time() - start >= 0.2
+    assert ray.get(recver_proxy_actor.get_data.remote(5, 6)) == 5
+    assert ray.get(send_proxy.get_stats.remote())["sent_batches"] == 1
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_flush_full_batch():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12360"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        batching_policy={"window_us": 60 * 1000000, "max_bytes": 10000},
+    )
+
+    # The batch is sent once it's full, rather than after the window.
+    start = time.time()
+    data = [str(i) * 4000 for i in range(3)]
+    assert all(ray.get([send('test_party', d, i, i + 1) for i, d in enumerate(data)]))
+    assert time.time() - start < 30
+    for i, d in enumerate(data):
+        assert ray.get(recver_proxy_actor.get_data.remote(i, i + 1)) == d
+    send_proxy = ray.get_actor("SendProxyActor")
+    stats = ray.get(send_proxy.get_stats.remote())
+    assert stats["sent_batches"] == 1
+    assert stats["batched_messages"] == 3
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_batch_failure():
+    ray.init(address='local')
+    # Nothing is listening on this address.
+    SERVER_ADDRESS = "127.0.0.1:12361"
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        retry_policy={
+            "maxAttempts": 2,
+            "initialBackoff": "0.1s",
+            "maxBackoff": "0.1s",
+            "backoffMultiplier": 1,
+            "retryableStatusCodes": ["UNAVAILABLE"],
+        },
+        batching_policy={"window_us": 200000},
+    )
+
+    # Every message in the batch gets the error.
+    sendings = [send('test_party', i, i, i + 1) for i in range(3)]
+    for sending in sendings:
+        with pytest.raises(RuntimeError, match="UNAVAILABLE"):
+            ray.get(sending)
+    send_proxy = ray.get_actor("SendProxyActor")
+    stats = ray.get(send_proxy.get_stats.remote())
+    assert stats["sent_batches"] == 1
+    assert stats["batched_messages"] == 3
+
+    wait_sending()
+    ray.shutdown()
+
+
+@pytest.mark.parametrize("executor", ["thread", "process", "none"])
+def test_serializing_executor(executor):
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12348"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        compression="gzip",
+        serializing_policy={"executor": executor, "max_workers": 2},
+    )
+
+    data = {"weights": np.random.rand(100, 100), "step": 1}
+    assert ray.get(send('test_party', data, 0, 1))
+    received = ray.get(recver_proxy_actor.get_data.remote(0, 1))
+    np.testing.assert_array_equal(received["weights"], data["weights"])
+
+    send_proxy = ray.get_actor("SendProxyActor")
+    stats = ray.get(send_proxy.get_stats.remote())
+    assert stats["serialized_bytes"] > 0
+    assert stats["serializing_s"] > 0
+    assert "loop_blocked_s" in stats
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_recv_memory_budget():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12349"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party", memory_budget=10000)
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy({'test_party': {'address': SERVER_ADDRESS}}, 'test_party')
+
+    # The first data is accepted though it's larger than the budget.
+    assert ray.get(send('test_party', b"1" * 20000, 0, 1))
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert stats["queued_bytes"] > 20000
+    assert stats["queued_messages"] == 1
+
+    # The second one is rejected until the first one is consumed.
+    sending = send('test_party', b"2" * 20000, 1, 2)
+    ready, _ = ray.wait([sending], timeout=1)
+    assert not ready
+    assert ray.get(recver_proxy_actor.get_data.remote(0, 1)) == b"1" * 20000
+    assert ray.get(sending)
+    assert ray.get(recver_proxy_actor.get_data.remote(1, 2)) == b"2" * 20000
+
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert stats["queued_bytes"] == 0
+    assert stats["rejected_messages"] > 0
+    send_proxy = ray.get_actor("SendProxyActor")
+    assert ray.get(send_proxy.get_stats.remote())["backpressure_retries"] > 0
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_retry_delta_rejected_by_memory_budget():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12358"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party", memory_budget=100000)
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy({'test_party': {'address': SERVER_ADDRESS}}, 'test_party')
+
+    model = np.random.rand(10000)
+    assert ray.get(send('test_party', model, 0, 1, delta_edge="model"))
+    np.testing.assert_array_equal(
+        ray.get(recver_proxy_actor.get_data.remote(0, 1)), model
+    )
+
+    # The delta is rejected while the other data is queued.
+    assert ray.get(send('test_party', b"1" * 200000, 1, 2))
+    model = model.copy()
+    model[:10] += 1
+    sending = send('test_party', model, 2, 3, delta_edge="model")
+    ready, _ = ray.wait([sending], timeout=1)
+    assert not ready
+    assert ray.get(recver_proxy_actor.get_data.remote(1, 2)) == b"1" * 200000
+    assert ray.get(sending)
+    np.testing.assert_array_equal(
+        ray.get(recver_proxy_actor.get_data.remote(2, 3)), model
+    )
+
+    # The retried delta is applied to the base kept, not sent in full.
+    recv_stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert recv_stats["rejected_messages"] > 0
+    assert recv_stats["delta_base_misses"] == 0
+    send_proxy = ray.get_actor("SendProxyActor")
+    assert ray.get(send_proxy.get_stats.remote())["delta_saved_bytes"] > 0
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_spill_received_data(tmp_path):
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12350"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(
+        SERVER_ADDRESS,
+        "test_party",
+        spill_policy={"watermark_bytes": 10000, "spill_dir": str(tmp_path)},
+    )
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy({'test_party': {'address': SERVER_ADDRESS}}, 'test_party')
+
+    data = [np.random.rand(1000) for _ in range(3)]
+    for i in range(3):
+        assert ray.get(send('test_party', data[i], i, i + 1))
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    # The first one is kept in memory, and the others are spilled.
+    assert 0 < stats["queued_bytes"] <= 10000
+    assert stats["spilled_bytes"] > 10000
+    for i in range(3):
+        received = ray.get(recver_proxy_actor.get_data.remote(i, i + 1))
+        np.testing.assert_array_equal(received, data[i])
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert stats["spilled_bytes"] == 0
+    assert not any(tmp_path.glob("*/*"))
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_received_data_size():
+    async def _run():
+        loop = asyncio.get_event_loop()
+        decoding = loop.create_future()
+        assert _received_data_size(decoding) == 0
+        decoding.set_result(b"data")
+        assert _received_data_size(decoding) == 4
+        failed = loop.create_future()
+        failed.set_exception(ValueError())
+        assert _received_data_size(failed) == 0
+        cancelled = loop.create_future()
+        cancelled.cancel()
+        assert _received_data_size(cancelled) == 0
+
+    asyncio.run(_run())
+    assert _received_data_size(b"data") == 4
+
+
+def test_evict_stale_entries():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12351"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party", entry_ttl_s=2)
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy({'test_party': {'address': SERVER_ADDRESS}}, 'test_party')
+
+    # The data never consumed.
+    assert ray.get(send('test_party', b"1" * 1000, 0, 1))
+    # The consumer of the data never sent.
+    waiting = recver_proxy_actor.get_data.remote(1, 2)
+    time.sleep(0.5)
+    entries = ray.get(recver_proxy_actor.list_stale_entries.remote(0))
+    entries = {(e["upstream_seq_id"], e["downstream_seq_id"]): e for e in entries}
+    assert not entries[("0", "1")]["waiting"]
+    assert entries[("0", "1")]["size"] > 1000
+    assert entries[("1", "2")]["waiting"]
+
+    with pytest.raises(TimeoutError):
+        ray.get(waiting, timeout=10)
+    assert ray.get(recver_proxy_actor.list_stale_entries.remote(0)) == []
+    stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert stats["evicted_messages"] == 1
+    assert stats["evicted_bytes"] > 1000
+    assert stats["timed_out_waiters"] == 1
+    assert stats["queued_bytes"] == 0
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_broadcast():
+    ray.init(address='local')
+    cluster = {}
+    recver_proxy_actors = []
+    for i in range(3):
+        party = f"test_party_{i}"
+        address = f"127.0.0.1:{12352 + i}"
+        cluster[party] = {'address': address}
+        recver_proxy_actor = RecverProxyActor.options(
+            name=f"RecverProxyActor-{party}", max_concurrency=2000
+        ).remote(address, party)
+        recver_proxy_actor.run_grpc_server.remote()
+        assert ray.get(recver_proxy_actor.is_ready.remote())
+        recver_proxy_actors.append(recver_proxy_actor)
+    start_send_proxy(cluster, 'test_party_0')
+
+    data = np.random.rand(100, 100)
+    assert ray.get(broadcast(list(cluster), data, 0, 1))
+    for recver_proxy_actor in recver_proxy_actors:
+        received = ray.get(recver_proxy_actor.get_data.remote(0, 1))
+        np.testing.assert_array_equal(received, data)
+    send_proxy = ray.get_actor("SendProxyActor")
+    stats = ray.get(send_proxy.get_stats.remote())
+    # Serialized only once for all parties.
+    assert data.nbytes < stats["serialized_bytes"] < 2 * data.nbytes
+
+    wait_sending()
+    ray.shutdown()
+
+
+@pytest.mark.parametrize("cache_bytes", [None, 1024])
+def test_content_dedup(cache_bytes):
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12355"
+    content_dedup_policy = {"cache_bytes": cache_bytes} if cache_bytes else {}
+    content_dedup_policy["min_bytes"] = 1024
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(
+        SERVER_ADDRESS, "test_party", content_dedup_policy=content_dedup_policy
+    )
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        content_dedup_policy=content_dedup_policy,
+    )
+
+    data = np.random.rand(100, 100)
+    for i in range(3):
+        assert ray.get(send('test_party', data, i, i + 1))
+        received = ray.get(recver_proxy_actor.get_data.remote(i, i + 1))
+        np.testing.assert_array_equal(received, data)
+
+    send_proxy = ray.get_actor("SendProxyActor")
+    send_stats = ray.get(send_proxy.get_stats.remote())
+    recv_stats = ray.get(recver_proxy_actor.get_stats.remote())
+    if cache_bytes is None:
+        assert send_stats["deduplicated_bytes"] > 2 * data.nbytes
+        assert recv_stats["content_cache_hits"] == 2
+        assert recv_stats["content_cache_misses"] == 0
+    else:
+        # Not cached by the receiver, so the data is sent again.
+        assert send_stats["deduplicated_bytes"] == 0
+        assert recv_stats["content_cache_hits"] == 0
+        assert recv_stats["content_cache_misses"] == 2
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_content_dedup_wrong_hash():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12362"
+    content_dedup_policy = {"min_bytes": 1024}
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(
+        SERVER_ADDRESS, "test_party", content_dedup_policy=content_dedup_policy
+    )
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        content_dedup_policy=content_dedup_policy,
+    )
+
+    data = np.random.rand(100, 100)
+    frames = dumps_frames(data)
+    content_hash = fed_content_dedup.hash_frames(frames)
+    # Another party sends forged data under the hash of the data.
+    with grpc.insecure_channel(SERVER_ADDRESS) as channel:
+        grpc.channel_ready_future(channel).result(timeout=30)
+        stub = fed_pb2_grpc.GrpcServiceStub(channel)
+        with pytest.raises(grpc.RpcError) as e:
+            stub.SendData(
+                fed_pb2.SendDataRequest(
+                    data=b"forged",
+                    upstream_seq_id="0",
+                    downstream_seq_id="1",
+                    codec="none",
+                    content_hash=content_hash,
+                )
+            )
+        assert e.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+
+    for i in range(1, 3):
+        assert ray.get(send('test_party', data, i, i + 1))
+        received = ray.get(recver_proxy_actor.get_data.remote(i, i + 1))
+        np.testing.assert_array_equal(received, data)
+    recv_stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert recv_stats["content_cache_hits"] == 1
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_content_dedup_only_in_sender():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12357"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        content_dedup_policy={"min_bytes": 1024},
+    )
+
+    data = np.random.rand(100, 100)
+    for i in range(3):
+        assert ray.get(send('test_party', data, i, i + 1))
+        received = ray.get(recver_proxy_actor.get_data.remote(i, i + 1))
+        np.testing.assert_array_equal(received, data)
+
+    # The receiver doesn't cache the data, so the data is sent again.
+    send_proxy = ray.get_actor("SendProxyActor")
+    send_stats = ray.get(send_proxy.get_stats.remote())
+    recv_stats = ray.get(recver_proxy_actor.get_stats.remote())
+    assert send_stats["deduplicated_bytes"] == 0
+    assert recv_stats["content_cache_misses"] == 2
+
+    wait_sending()
+    ray.shutdown()
+
+
+def test_send_sparse_arrays():
+    ray.init(address='local')
+    SERVER_ADDRESS = "127.0.0.1:12356"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-TEST", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party")
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}},
+        'test_party',
+        sparsity_threshold=0.9,
+    )
+
+    data = np.zeros((1000, 100))
+    data[::100] = 1
+    assert ray.get(send('test_party', data, 0, 1))
+    received = ray.get(recver_proxy_actor.get_data.remote(0, 1))
+    np.testing.assert_array_equal(received, data)
+    send_proxy = ray.get_actor("SendProxyActor")
+    stats = ray.get(send_proxy.get_stats.remote())
+    assert stats["serialized_bytes"] < data.nbytes / 10
+
+    wait_sending()
+    ray.shutdown()
+
+
 if __name__ == "__main__":
     import sys
 
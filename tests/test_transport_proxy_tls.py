@@ -13,13 +13,22 @@
 # limitations under the License.
 
 import os
+import shutil
+import socket
+import ssl
+
 import pytest
 
 import ray
 import cloudpickle
 import ray.experimental.internal_kv as internal_kv
 
-from fed.barriers import RecverProxyActor, send, start_send_proxy
+from fed.barriers import (
+    RecverProxyActor,
+    reload_tls_credentials,
+    send,
+    start_send_proxy,
+)
 from fed.cleanup import wait_sending
 from fed._private.constants import RAYFED_TLS_CONFIG
 
@@ -76,6 +85,71 @@ def test_n_to_1_transport():
     ray.shutdown()
 
 
+def _server_cert_der(address, cert_config):
+    """Get the cert that the server presents in a new handshake."""
+    host, port = address.split(":")
+    context = ssl.create_default_context(cafile=cert_config["ca_cert"])
+    context.load_cert_chain(cert_config["cert"], cert_config["key"])
+    context.set_alpn_protocols(["h2"])
+    with socket.create_connection((host, int(port))) as sock:
+        with context.wrap_socket(sock, server_hostname="localhost") as tls_sock:
+            return tls_sock.getpeercert(binary_form=True)
+
+
+def _cert_der(cert_file):
+    with open(cert_file) as f:
+        return ssl.PEM_cert_to_DER_cert(f.read())
+
+
+def test_reload_tls_credentials(tmp_path):
+    ray.init(address='local')
+
+    certs_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cert_files")
+    # Copy the certs to be rotated in place.
+    cert_dir = str(tmp_path / "alice_certs")
+    shutil.copytree(os.path.join(certs_dir, "alice_certs"), cert_dir)
+    ca_config = {
+        "ca_cert": os.path.join(cert_dir, "cacert.pem"),
+        "cert": os.path.join(cert_dir, "servercert.pem"),
+        "key": os.path.join(cert_dir, "serverkey.pem"),
+    }
+    tls_config = {"cert": ca_config, "client_certs": {"test_node_party": ca_config}}
+    internal_kv._internal_kv_put(RAYFED_TLS_CONFIG, cloudpickle.dumps(tls_config))
+
+    SERVER_ADDRESS = "127.0.0.1:65423"
+    recver_proxy_actor = RecverProxyActor.options(
+        name=f"RecverProxyActor-test_party", max_concurrency=2000
+    ).remote(SERVER_ADDRESS, "test_party", tls_config)
+    recver_proxy_actor.run_grpc_server.remote()
+    assert ray.get(recver_proxy_actor.is_ready.remote())
+    start_send_proxy(
+        {'test_party': {'address': SERVER_ADDRESS}}, 'test_party', tls_config
+    )
+
+    assert ray.get(send('test_party', "data-0", 0, 1, "test_node_party"))
+    assert ray.get(recver_proxy_actor.get_data.remote(0, 1)) == "data-0"
+    send_proxy = ray.get_actor("SendProxyActor")
+    assert ray.get(send_proxy.get_stats.remote())["created_channels"] == 1
+    old_cert = _cert_der(ca_config["cert"])
+    assert _server_cert_der(SERVER_ADDRESS, ca_config) == old_cert
+
+    # Replace the cert and key with another pair signed by the same CA.
+    for name in ["servercert.pem", "serverkey.pem"]:
+        shutil.copy(os.path.join(certs_dir, "alice_rotated_certs", name), cert_dir)
+    new_cert = _cert_der(ca_config["cert"])
+    assert new_cert != old_cert
+    reload_tls_credentials("test_party")
+
+    # The following message goes through a new channel with the new certs.
+    assert ray.get(send('test_party', "data-1", 1, 2, "test_node_party"))
+    assert ray.get(recver_proxy_actor.get_data.remote(1, 2)) == "data-1"
+    assert ray.get(send_proxy.get_stats.remote())["created_channels"] == 2
+    assert _server_cert_der(SERVER_ADDRESS, ca_config) == new_cert
+
+    wait_sending()
+    ray.shutdown()
+
+
 if __name__ == "__main__":
     import sys
 
@@ -0,0 +1,79 @@
+# Copyright 2022 Ant Group Co., Ltd.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+
+import numpy as np
+import pytest
+
+from fed._private.tree_util import find_instances, replace_instances
+
+
+class Leaf:
+    def __init__(self, value) -> None:
+        self.value = value
+
+
+Point = collections.namedtuple("Point", ["x", "y"])
+
+
+def _tree(a, b, c):
+    return (
+        [1, "s", a, (1.5, b"x")],
+        {
+            "b": Point(b, None),
+            "o": collections.OrderedDict(c=[c]),
+            "d": collections.defaultdict(list, {"e": {1, 2}}),
+        },
+    )
+
+
+def test_find_instances():
+    a, b, c = Leaf(1), Leaf(2), Leaf(3)
+    assert find_instances(_tree(a, b, c), Leaf) == [a, b, c]
+    assert find_instances([1, {2, Leaf(0)}], Leaf) == []
+
+
+def test_replace_instances():
+    tree = _tree(Leaf(1), Leaf(2), Leaf(3))
+    replaced = replace_instances(tree, Leaf, lambda leaf: leaf.value)
+    args, kwargs = replaced
+    assert args[:3] == [1, "s", 1]
+    assert kwargs["b"] == Point(2, None)
+    assert type(kwargs["o"]) is collections.OrderedDict
+    assert kwargs["o"] == {"c": [3]}
+    # The containers without any leaf replaced are not copied.
+    assert kwargs["d"] is tree[1]["d"]
+    assert args[3] is tree[0][3]
+
+    array = np.zeros(3)
+    assert replace_instances([array], Leaf, None)[0] is array
+
+
+def test_same_as_jax():
+    jax = pytest.importorskip("jax")
+    tree = _tree(Leaf(1), Leaf(2), Leaf(3))
+    replaced = replace_instances(tree, Leaf, lambda leaf: leaf.value)
+    leaves, structure = jax.tree_util.tree_flatten(tree)
+    expected = jax.tree_util.tree_unflatten(
+        structure, [x.value if isinstance(x, Leaf) else x for x in leaves]
+    )
+    # The order of the dict keys is kept, which is sorted by jax.
+    assert replaced == expected
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(pytest.main(["-sv", __file__]))